@@ -0,0 +1,621 @@
+import numpy as np
+import pandas as pd
+
+# Overs are 0-indexed in the ball-by-ball data: 0-5, 6-14 and 15-19
+PHASE_LABELS = ["Powerplay (0-6)", "Middle Overs (7-15)", "Death Overs (16-20)"]
+PHASE_BINS = [-1, 5, 14, 19]
+
+# Ball-by-ball order; enriched deliveries are kept sorted this way
+DELIVERY_ORDER = ['match_id', 'inning', 'over', 'ball']
+
+
+def _group_layout(df, column):
+    # Row order sorting by `column`, so each key owns a contiguous block of
+    # `order`; the rows themselves are only taken on lookup
+    keys = df[column]
+    if not isinstance(keys.dtype, pd.CategoricalDtype):
+        keys = keys.astype('category')
+    codes = keys.cat.codes.to_numpy()
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    n_keys = len(keys.cat.categories)
+    offsets = np.searchsorted(sorted_codes, np.arange(n_keys + 1))
+    positions = {name: i for i, name in enumerate(keys.cat.categories)}
+    return order, offsets, positions
+
+
+class PlayerIndex:
+    """Per-player headline metrics plus the deliveries' row order by player.
+
+    Built once per data version; metric lookups are keyed and `batter_rows` /
+    `bowler_rows` take one contiguous block of row positions instead of
+    masking the full table, so no sorted copy of the deliveries is kept.
+    """
+
+    def __init__(self, df_deliveries):
+        self.batting = batting_stats(df_deliveries)
+        self.bowling = bowling_stats(df_deliveries)
+        self.batter_runs_hist = (
+            df_deliveries.groupby(['batter', 'batter_runs'], observed=True).size().unstack(fill_value=0)
+        )
+        self.bowler_runs_hist = (
+            df_deliveries.groupby(['bowler', 'total_runs'], observed=True).size().unstack(fill_value=0)
+        )
+        self.deliveries = df_deliveries
+        self._by_batter = _group_layout(df_deliveries, 'batter')
+        self._by_bowler = _group_layout(df_deliveries, 'bowler')
+
+    def _slice(self, layout, name):
+        order, offsets, positions = layout
+        pos = positions.get(name)
+        if pos is None:
+            return self.deliveries.iloc[0:0]
+        return self.deliveries.take(order[offsets[pos]:offsets[pos + 1]])
+
+    def batters(self):
+        return sorted(self.batting.index)
+
+    def bowlers(self):
+        return sorted(self.bowling.index)
+
+    def batter_rows(self, name):
+        return self._slice(self._by_batter, name)
+
+    def bowler_rows(self, name):
+        return self._slice(self._by_bowler, name)
+
+    def batter_histogram(self, name):
+        hist = self.batter_runs_hist.loc[name]
+        return hist[hist > 0]
+
+    def bowler_histogram(self, name):
+        hist = self.bowler_runs_hist.loc[name]
+        return hist[hist > 0]
+
+
+class MatchIndex:
+    """Per-match partitions of the ball-by-ball-sorted deliveries.
+
+    `offsets[i]:offsets[i + 1]` is the row range of the i-th match id, found
+    with a binary search, and matches are indexed by id for direct lookup.
+    """
+
+    def __init__(self, df_deliveries, df_matches):
+        if not df_deliveries['match_id'].is_monotonic_increasing:
+            df_deliveries = df_deliveries.sort_values(DELIVERY_ORDER, kind='stable', ignore_index=True)
+        self.deliveries = df_deliveries
+        match_ids = df_deliveries['match_id'].to_numpy()
+        self.match_ids = np.unique(match_ids)
+        self.offsets = np.searchsorted(match_ids, np.append(self.match_ids, np.iinfo(match_ids.dtype).max))
+        self.matches = df_matches.set_index('id', drop=False).sort_index()
+
+    def match(self, match_id):
+        return self.matches.loc[match_id]
+
+    def deliveries_for(self, match_id):
+        pos = np.searchsorted(self.match_ids, match_id)
+        if pos == len(self.match_ids) or self.match_ids[pos] != match_id:
+            return self.deliveries.iloc[0:0]
+        return self.deliveries.iloc[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def scorecard(self, match_id):
+        """Ball-by-ball rows for one match with the running innings score."""
+        rows = self.deliveries_for(match_id)
+        card = pd.DataFrame({
+            'inning': rows['inning'].to_numpy(),
+            'batting_team': rows['batting_team'].to_numpy(),
+            'ball': (rows['over'].astype(str) + '.' + rows['ball'].astype(str)).to_numpy(),
+            'batter': rows['batter'].to_numpy(),
+            'bowler': rows['bowler'].to_numpy(),
+            'runs': rows['total_runs'].to_numpy(),
+            'wicket': rows['is_wicket'].to_numpy(),
+        })
+        grouped = card.groupby('inning')
+        card['score'] = (
+            grouped['runs'].cumsum().astype(str) + '/' + grouped['wicket'].cumsum().astype(str)
+        )
+        return card
+
+
+class HeadToHead:
+    """Dense (season, team_a, team_b) tensor of head-to-head results.
+
+    `counts[field, s, a, b]` holds, for each field in FIELDS, the number of
+    season-s matches between team a and team b. 'wins' counts wins of a
+    over b; the other fields are symmetric. Tied matches decided by a super
+    over count as a tie and as a win for the super-over winner.
+    """
+
+    FIELDS = ('matches', 'wins', 'ties', 'no_results')
+
+    def __init__(self, df_matches):
+        team1 = df_matches['team1'].astype('category')
+        self.teams = team1.cat.categories
+        team_dtype = pd.CategoricalDtype(self.teams)
+        a = team1.cat.codes.to_numpy()
+        b = df_matches['team2'].astype(team_dtype).cat.codes.to_numpy()
+        winner = df_matches['winner'].astype(team_dtype).cat.codes.to_numpy()
+        self.seasons = np.sort(df_matches['season'].unique())
+        s = np.searchsorted(self.seasons, df_matches['season'].to_numpy())
+        result = df_matches['result'].to_numpy(dtype=object)
+
+        n_teams = len(self.teams)
+        counts = np.zeros((len(self.FIELDS), len(self.seasons), n_teams, n_teams), dtype=np.int32)
+        valid = (a >= 0) & (b >= 0)
+        a, b, s, winner, result = a[valid], b[valid], s[valid], winner[valid], result[valid]
+        for i, j in ((a, b), (b, a)):
+            np.add.at(counts[0], (s, i, j), 1)
+            np.add.at(counts[1], (s, i, j), (winner == i).astype(np.int32))
+            np.add.at(counts[2], (s, i, j), (result == 'tie').astype(np.int32))
+            np.add.at(counts[3], (s, i, j), (result == 'no result').astype(np.int32))
+        self.counts = counts
+        self._positions = {team: i for i, team in enumerate(self.teams)}
+
+    def field(self, name):
+        return self.counts[self.FIELDS.index(name)]
+
+    def played_teams(self):
+        played = self.field('matches').sum(axis=(0, 2)) > 0
+        return list(self.teams[played])
+
+    def record(self, team_a, team_b):
+        a, b = self._positions[team_a], self._positions[team_b]
+        totals = self.counts[:, :, a, b].sum(axis=1)
+        return {
+            'matches': int(totals[0]),
+            'wins_a': int(totals[1]),
+            'wins_b': int(self.field('wins')[:, b, a].sum()),
+            'ties': int(totals[2]),
+            'no_results': int(totals[3]),
+        }
+
+    def by_season(self, team_a, team_b):
+        """Wins for each side per season, for seasons in which they met."""
+        a, b = self._positions[team_a], self._positions[team_b]
+        wins = self.field('wins')
+        played = self.field('matches')[:, a, b] > 0
+        return pd.DataFrame(
+            {team_a: wins[played, a, b], team_b: wins[played, b, a]},
+            index=pd.Index(self.seasons[played], name='season'),
+        )
+
+    def summary_matrix(self, field='wins'):
+        """Team x opponent totals over all seasons, for teams that played."""
+        totals = self.field(field).sum(axis=0)
+        played = self.field('matches').sum(axis=(0, 2)) > 0
+        return pd.DataFrame(
+            totals[np.ix_(played, played)],
+            index=pd.Index(self.teams[played], name='team'),
+            columns=pd.Index(self.teams[played], name='opponent'),
+        )
+
+
+class MatchCube:
+    """Match counts over (season, venue, winner, toss_winner, toss_decision, result).
+
+    Every match-level view rolls its group-by up from these cells instead of
+    rescanning the matches table. No-result matches keep a NaN winner.
+    """
+
+    DIMENSIONS = ['season', 'venue', 'winner', 'toss_winner', 'toss_decision', 'result']
+
+    def __init__(self, df_matches):
+        self.cells = (
+            df_matches.groupby(self.DIMENSIONS, observed=True, dropna=False)
+            .size()
+            .rename('count')
+            .reset_index()
+        )
+
+    def seasons(self):
+        return sorted(self.cells['season'].unique())
+
+    def teams(self):
+        names = set(self.cells['toss_winner'].dropna()) | set(self.cells['winner'].dropna())
+        return sorted(names)
+
+    def select(self, seasons=None, **filters):
+        """Cells within an inclusive (first, last) season range matching `filters`."""
+        cells = self.cells
+        mask = np.ones(len(cells), dtype=bool)
+        if seasons is not None:
+            first, last = seasons
+            mask &= cells['season'].between(first, last).to_numpy()
+        for dimension, value in filters.items():
+            mask &= (cells[dimension] == value).to_numpy()
+        return cells[mask]
+
+    def rollup(self, dimensions, seasons=None, dropna=True, **filters):
+        """Match counts grouped by `dimensions`, like value_counts/groupby().size()."""
+        cells = self.select(seasons, **filters)
+        if dropna:
+            cells = cells.dropna(subset=dimensions)
+        counts = cells.groupby(dimensions, observed=True, dropna=False)['count'].sum()
+        return counts[counts > 0]
+
+
+# Dismissals not credited to the bowler, so not counted against a matchup
+NON_BOWLER_DISMISSALS = ('run out', 'retired hurt', 'retired out', 'obstructing the field')
+
+
+class Matchups:
+    """Sparse batter x bowler matrix of balls, runs, dismissals and boundaries.
+
+    Only pairs that met are stored: `counts[field][i]` is the total for the
+    i-th pair, with pairs sorted by (batter, bowler) code. `_batter_offsets`
+    delimits each batter's block and `_bowler_order` / `_bowler_offsets` do
+    the same for bowlers, so every query slices the matrix instead of
+    rescanning the deliveries. Balls count every delivery, as in
+    batting_stats.
+    """
+
+    FIELDS = ('balls', 'runs', 'dismissals', 'fours', 'sixes')
+
+    def __init__(self, df_deliveries):
+        batter = df_deliveries['batter'].astype('category')
+        self.players = batter.cat.categories.union(df_deliveries['bowler'].astype('category').cat.categories)
+        dtype = pd.CategoricalDtype(self.players)
+        n = len(self.players)
+        b = df_deliveries['batter'].astype(dtype).cat.codes.to_numpy().astype(np.int64)
+        w = df_deliveries['bowler'].astype(dtype).cat.codes.to_numpy().astype(np.int64)
+        runs = df_deliveries['batter_runs'].to_numpy()
+        kind = df_deliveries['dismissal_kind']
+        dismissed = kind.notna() & ~kind.isin(NON_BOWLER_DISMISSALS)
+        if 'player_dismissed' in df_deliveries.columns:
+            # Non-striker run-outs aside, the batter on strike is the one out
+            out = df_deliveries['player_dismissed'].astype(object)
+            dismissed &= out.isna() | (out == df_deliveries['batter'].astype(object))
+        valid = (b >= 0) & (w >= 0)
+
+        keys, pair = np.unique(b[valid] * n + w[valid], return_inverse=True)
+        weights = {
+            'balls': None,
+            'runs': runs[valid],
+            'dismissals': dismissed.to_numpy()[valid],
+            'fours': runs[valid] == 4,
+            'sixes': runs[valid] == 6,
+        }
+        self.counts = {
+            field: np.bincount(pair, weights=weight, minlength=len(keys)).astype(np.int64)
+            for field, weight in weights.items()
+        }
+        self.batter_codes = keys // n
+        self.bowler_codes = keys % n
+        self._batter_offsets = np.searchsorted(self.batter_codes, np.arange(n + 1))
+        self._bowler_order = np.argsort(self.bowler_codes, kind='stable')
+        self._bowler_offsets = np.searchsorted(self.bowler_codes[self._bowler_order], np.arange(n + 1))
+        self._positions = {name: i for i, name in enumerate(self.players)}
+
+    def _frame(self, rows):
+        counts = {field: values[rows] for field, values in self.counts.items()}
+        df = pd.DataFrame({
+            'batter': self.players[self.batter_codes[rows]],
+            'bowler': self.players[self.bowler_codes[rows]],
+            **counts,
+        })
+        dismissals = df['dismissals'].replace(0, np.nan)
+        df['strike_rate'] = (df['runs'] / df['balls'] * 100).round(2)
+        df['average'] = (df['runs'] / dismissals).round(2)
+        return df
+
+    def _batter_rows(self, name):
+        pos = self._positions.get(name)
+        if pos is None:
+            return np.arange(0)
+        return np.arange(self._batter_offsets[pos], self._batter_offsets[pos + 1])
+
+    def _bowler_rows(self, name):
+        pos = self._positions.get(name)
+        if pos is None:
+            return np.arange(0)
+        return self._bowler_order[self._bowler_offsets[pos]:self._bowler_offsets[pos + 1]]
+
+    def batters(self):
+        return list(self.players[np.unique(self.batter_codes)])
+
+    def bowlers(self):
+        return list(self.players[np.unique(self.bowler_codes)])
+
+    def matchup(self, batter, bowler):
+        """Totals for one pair; all zero if they never met."""
+        rows = self._batter_rows(batter)
+        pos = self._positions.get(bowler, -1)
+        i = np.searchsorted(self.bowler_codes[rows], pos)
+        if i < len(rows) and self.bowler_codes[rows[i]] == pos:
+            return self._frame(rows[i:i + 1]).iloc[0]
+        return pd.Series({
+            'batter': batter, 'bowler': bowler, **dict.fromkeys(self.FIELDS, 0),
+            'strike_rate': np.nan, 'average': np.nan,
+        })
+
+    def for_batter(self, batter, min_balls=0):
+        """Every bowler `batter` has faced, with at least `min_balls` balls."""
+        df = self._frame(self._batter_rows(batter))
+        return df[df['balls'] >= min_balls].reset_index(drop=True)
+
+    def for_bowler(self, bowler, min_balls=0):
+        df = self._frame(self._bowler_rows(bowler))
+        return df[df['balls'] >= min_balls].reset_index(drop=True)
+
+    def bunnies(self, bowler, k=10):
+        """Batters `bowler` has dismissed most often, cheapest first on ties."""
+        df = self.for_bowler(bowler)
+        df = df[df['dismissals'] > 0]
+        return df.sort_values(['dismissals', 'average'], ascending=[False, True], kind='stable').head(k)
+
+    def top(self, k=10, min_balls=30, by='strike_rate', ascending=False):
+        """The k pairs with the highest (or lowest) `by` among those with enough balls."""
+        balls = self.counts['balls']
+        candidates = np.flatnonzero(balls >= min_balls)
+        if by == 'strike_rate':
+            values = self.counts['runs'][candidates] / balls[candidates]
+        else:
+            values = self.counts[by][candidates]
+        if not ascending:
+            values = -values
+        if len(candidates) > k:
+            keep = np.argpartition(values, k)[:k]
+            candidates, values = candidates[keep], values[keep]
+        return self._frame(candidates[np.argsort(values, kind='stable')]).reset_index(drop=True)
+
+
+def match_sequence(df_matches):
+    """Chronological position of every match id (by date, then id)."""
+    columns = ['date', 'id'] if 'date' in df_matches.columns else ['id']
+    ordered = df_matches.sort_values(columns, kind='stable')['id'].to_numpy()
+    return pd.Series(np.arange(len(ordered)), index=ordered)
+
+
+class _Windows:
+    """Rows grouped into blocks by `keys`, in match order, with prefix sums.
+
+    `prefix[column][i]` is the sum of `column` over rows before i. Windowed
+    sums for any length are two lookups into the prefix arrays, clipped at
+    the start of each row's block, so every entity's rolling values cost
+    O(rows) in total and changing the window reuses the same arrays.
+    Queries by name use the first key, which must be categorical.
+    """
+
+    def __init__(self, df, keys, columns):
+        self.rows = df.sort_values(keys + ['seq'], kind='stable', ignore_index=True)
+        n = len(self.rows)
+        boundary = np.zeros(n, dtype=bool)
+        boundary[:1] = True
+        for key in keys:
+            values = self.rows[key].to_numpy()
+            boundary[1:] |= values[1:] != values[:-1]
+        self.block_start = np.maximum.accumulate(np.where(boundary, np.arange(n), 0))
+        self.prefix = {
+            column: np.concatenate([[0], np.cumsum(self.rows[column].to_numpy(dtype=np.int64))])
+            for column in columns
+        }
+        entity = self.rows[keys[0]]
+        codes = entity.cat.codes.to_numpy()
+        self.offsets = np.searchsorted(codes, np.arange(len(entity.cat.categories) + 1))
+        self.positions = {name: i for i, name in enumerate(entity.cat.categories)}
+        self._sums = {}
+
+    def sums(self, window=None):
+        """Per-row sums over the last `window` rows of the block (None: all so far)."""
+        sums = self._sums.get(window)
+        if sums is None:
+            end = np.arange(1, len(self.rows) + 1)
+            start = self.block_start if window is None else np.maximum(end - window, self.block_start)
+            sums = {column: prefix[end] - prefix[start] for column, prefix in self.prefix.items()}
+            self._sums[window] = sums
+        return sums
+
+    def entity(self, name, window=None):
+        pos = self.positions.get(name)
+        if pos is None:
+            rows = slice(0, 0)
+        else:
+            rows = slice(self.offsets[pos], self.offsets[pos + 1])
+        df = self.rows.iloc[rows].reset_index(drop=True)
+        for column, values in self.sums(window).items():
+            df[f'form_{column}'] = values[rows]
+        return df
+
+
+class RollingForm:
+    """Recent form for every batter, bowler and team from grouped cumulative sums.
+
+    Batters are windowed over innings, bowlers over matches bowled in and
+    teams over their matches within each season.
+    """
+
+    def __init__(self, df_deliveries, df_matches):
+        seq = match_sequence(df_matches)
+        seasons = df_matches.set_index('id')['season']
+
+        def per_match(player, runs_column):
+            df = df_deliveries.groupby([player, 'match_id'], observed=True).agg(
+                runs=(runs_column, 'sum'),
+                balls=(runs_column, 'size'),
+            ).reset_index()
+            df['seq'] = seq.reindex(df['match_id']).to_numpy()
+            df['season'] = seasons.reindex(df['match_id']).to_numpy()
+            return df
+
+        self.batting = _Windows(per_match('batter', 'batter_runs'), ['batter'], ['runs', 'balls'])
+        self.bowling = _Windows(per_match('bowler', 'total_runs'), ['bowler'], ['runs', 'balls'])
+
+        teams = pd.concat([df_matches['team1'], df_matches['team2']], ignore_index=True).astype(object)
+        winner = pd.concat([df_matches['winner']] * 2, ignore_index=True).astype(object)
+        match_ids = pd.concat([df_matches['id']] * 2, ignore_index=True)
+        df_teams = pd.DataFrame({
+            'team': teams.astype('category'),
+            'match_id': match_ids,
+            'season': pd.concat([df_matches['season']] * 2, ignore_index=True),
+            'won': (teams == winner).astype('int64'),
+            'decided': winner.notna().astype('int64'),
+            'seq': seq.reindex(match_ids).to_numpy(),
+        }).dropna(subset=['team'])
+        self.teams = _Windows(df_teams, ['team', 'season'], ['won', 'decided'])
+
+    def batter(self, name, innings=5):
+        df = self.batting.entity(name, innings)
+        df['form_strike_rate'] = (df['form_runs'] / df['form_balls'] * 100).round(2)
+        return df
+
+    def bowler(self, name, matches=5):
+        df = self.bowling.entity(name, matches)
+        df['form_economy'] = (df['form_runs'] / (df['form_balls'] / 6)).round(2)
+        return df
+
+    def team(self, name, matches=None):
+        """Win % over the team's last `matches` games of each season (None: season
+        to date); no-results count towards the window but not the percentage."""
+        df = self.teams.entity(name, matches)
+        df['match_number'] = df.groupby('season').cumcount() + 1
+        df['form_win_pct'] = (df['form_won'] / df['form_decided'].replace(0, np.nan) * 100).round(2)
+        return df
+
+
+def batting_totals(df_deliveries):
+    # Additive per-batter counters; partial totals from chunks can be summed
+    runs = df_deliveries['batter_runs']
+    return pd.DataFrame({
+        'batter': df_deliveries['batter'],
+        'runs': runs.astype('int64'),
+        'fours': (runs == 4).astype('int64'),
+        'sixes': (runs == 6).astype('int64'),
+    }).groupby('batter', observed=True).agg(
+        total_runs=('runs', 'sum'),
+        total_balls=('runs', 'size'),
+        total_fours=('fours', 'sum'),
+        total_sixes=('sixes', 'sum'),
+    )
+
+
+def finish_batting(totals):
+    stats = totals.copy()
+    stats['strike_rate'] = (stats['total_runs'] / stats['total_balls'] * 100).round(2)
+    return stats
+
+
+def batting_stats(df_deliveries):
+    return finish_batting(batting_totals(df_deliveries))
+
+
+def bowling_totals(df_deliveries):
+    return pd.DataFrame({
+        'bowler': df_deliveries['bowler'],
+        'runs': df_deliveries['total_runs'].astype('int64'),
+        'wicket': df_deliveries['dismissal_kind'].notna().astype('int64'),
+    }).groupby('bowler', observed=True).agg(
+        total_balls=('runs', 'size'),
+        runs_conceded=('runs', 'sum'),
+        total_wickets=('wicket', 'sum'),
+    )
+
+
+def finish_bowling(totals):
+    stats = totals.copy()
+    balls = stats['total_balls']
+    wickets = stats['total_wickets'].replace(0, np.nan)
+    stats['economy'] = (stats['runs_conceded'] / (balls / 6)).round(2)
+    stats['strike_rate'] = (balls / wickets).round(2).fillna(0)
+    stats['average'] = (stats['runs_conceded'] / wickets).round(2).fillna(0)
+    return stats
+
+
+def bowling_stats(df_deliveries):
+    return finish_bowling(bowling_totals(df_deliveries))
+
+
+def match_totals(df_deliveries):
+    """Runs, balls and wickets per (match_id, batting_team) innings."""
+    return pd.DataFrame({
+        'match_id': df_deliveries['match_id'],
+        'batting_team': df_deliveries['batting_team'],
+        'runs': df_deliveries['total_runs'].astype('int64'),
+        'wickets': df_deliveries['is_wicket'].astype('int64'),
+    }).groupby(['match_id', 'batting_team'], observed=True).agg(
+        total_runs=('runs', 'sum'),
+        total_balls=('runs', 'size'),
+        total_wickets=('wickets', 'sum'),
+    )
+
+
+def combine_totals(partials):
+    # Sum additive totals computed over disjoint slices of the deliveries
+    partials = [p for p in partials if not p.empty]
+    if not partials:
+        return pd.DataFrame()
+    combined = pd.concat(partials)
+    return combined.groupby(level=list(range(combined.index.nlevels)), observed=True).sum()
+
+
+def affected_keys(df_deliveries, df_matches):
+    """Match ids, seasons and entity names touched by a batch of new rows."""
+    players = set()
+    for column in ('batter', 'bowler', 'non_striker', 'player_of_match'):
+        df = df_matches if column == 'player_of_match' else df_deliveries
+        if column in df.columns:
+            players.update(df[column].dropna().astype(str))
+    teams = set(df_matches['team1'].astype(str)) | set(df_matches['team2'].astype(str))
+    return {
+        'match_ids': sorted(int(i) for i in df_matches['id']),
+        'seasons': sorted(int(s) for s in df_matches['season'].unique()),
+        'teams': sorted(teams),
+        'venues': sorted(df_matches['venue'].dropna().astype(str).unique()),
+        'players': sorted(players),
+    }
+
+
+def enrich_deliveries(df_deliveries, df_matches):
+    """Attach match context (season, venue, opponent, result) to every delivery.
+
+    `opponent` is the side facing the batting team. `batting_result` and
+    `bowling_result` are 'Won' / 'Lost' / 'No Result' from the point of view
+    of the batting and bowling team respectively. `phase` is the innings
+    phase of the over (NaN for anything outside 20 overs).
+    """
+    matches = df_matches.set_index('id')
+    match_ids = df_deliveries['match_id']
+
+    def lookup(column):
+        return matches[column].reindex(match_ids)
+
+    # Compare teams as integer codes from one dictionary rather than strings
+    teams = df_deliveries['batting_team'].astype('category').cat.categories
+
+    def team_codes(values):
+        return pd.Categorical(values, categories=teams).codes
+
+    team1 = team_codes(lookup('team1'))
+    team2 = team_codes(lookup('team2'))
+    winner = team_codes(lookup('winner'))
+    batting = team_codes(df_deliveries['batting_team'])
+    bowling = team_codes(df_deliveries['bowling_team'])
+
+    season = lookup('season').to_numpy()
+    no_result = winner == -1
+    df = df_deliveries.copy()
+    df['season'] = season if pd.isna(season).any() else season.astype('int16')
+    df['venue'] = lookup('venue').astype('category').to_numpy()
+    df['opponent'] = pd.Categorical.from_codes(np.where(team1 == batting, team2, team1), categories=teams)
+    df['batting_result'] = pd.Categorical(
+        np.select([no_result, winner == batting], ['No Result', 'Won'], 'Lost')
+    )
+    df['bowling_result'] = pd.Categorical(
+        np.select([no_result, winner == bowling], ['No Result', 'Won'], 'Lost')
+    )
+    df['phase'] = assign_phase(df['over'])
+    return df.sort_values(DELIVERY_ORDER, kind='stable', ignore_index=True)
+
+
+def assign_phase(overs):
+    return pd.cut(overs, bins=PHASE_BINS, labels=PHASE_LABELS)
+
+
+def phase_cube(df_deliveries):
+    """Runs, balls, wickets and run rate per (match_id, batting_team, phase)."""
+    cube = df_deliveries.groupby(['match_id', 'batting_team', 'phase'], observed=True).agg(
+        total_runs=('batter_runs', 'sum'),
+        total_balls=('ball', 'count'),
+        total_wickets=('is_wicket', 'sum'),
+    )
+    cube['run_rate'] = (cube['total_runs'] / (cube['total_balls'] / 6)).round(2)
+    return cube.sort_index()
@@ -0,0 +1,230 @@
+"""Streamlit-free computations behind every dashboard view; each returns a dict of pandas objects."""
+from functools import cached_property
+
+import pandas as pd
+
+import aggregates
+import storage
+
+
+class Dataset:
+    """Loaded tables plus the aggregates built from them on first use."""
+
+    def __init__(self, df_deliveries, df_matches, data_version=None):
+        self.deliveries = df_deliveries
+        self.matches = df_matches
+        self.data_version = data_version
+
+    @cached_property
+    def player_index(self):
+        return aggregates.PlayerIndex(self.deliveries)
+
+    @cached_property
+    def phase_cube(self):
+        return aggregates.phase_cube(self.deliveries)
+
+    @cached_property
+    def match_index(self):
+        return aggregates.MatchIndex(self.deliveries, self.matches)
+
+    @cached_property
+    def head_to_head(self):
+        return aggregates.HeadToHead(self.matches)
+
+    @cached_property
+    def match_cube(self):
+        return aggregates.MatchCube(self.matches)
+
+    @cached_property
+    def matchups(self):
+        return aggregates.Matchups(self.deliveries)
+
+    @cached_property
+    def rolling_form(self):
+        return aggregates.RollingForm(self.deliveries, self.matches)
+
+
+def load_dataset(deliveries_path=storage.DELIVERIES_CSV, matches_path=storage.MATCHES_CSV, cache_dir=storage.CACHE_DIR):
+    def build():
+        df_deliveries, df_matches = storage.load_tables(deliveries_path, matches_path, cache_dir)
+        return aggregates.enrich_deliveries(df_deliveries, df_matches), df_matches
+
+    # Processes loading the same version (e.g. batch workers) share the mapped pages
+    version = storage.data_version(deliveries_path, matches_path)
+    df_deliveries, df_matches = storage.shared_tables(version, build, cache_dir)
+    return Dataset(df_deliveries, df_matches, version)
+
+
+def observed_counts(series):
+    # value_counts on a categorical also lists every unused category with 0
+    counts = series.value_counts()
+    return counts[counts > 0]
+
+
+def batter_analysis(player_index, batter):
+    df_batter = player_index.batter_rows(batter)
+    return {
+        'metrics': player_index.batting.loc[batter],
+        'runs_distribution': player_index.batter_histogram(batter),
+        'runs_vs_opponent': (
+            df_batter.groupby('opponent', observed=True)['batter_runs'].sum().sort_values(ascending=False, kind='stable')
+        ),
+        'runs_by_result': df_batter.groupby('batting_result', observed=True)['batter_runs'].sum(),
+    }
+
+
+def bowler_analysis(player_index, bowler):
+    df_bowler = player_index.bowler_rows(bowler)
+    dismissals = df_bowler.dropna(subset=['dismissal_kind'])
+    return {
+        'metrics': player_index.bowling.loc[bowler],
+        'runs_distribution': player_index.bowler_histogram(bowler),
+        'wickets_vs_opponent': (
+            dismissals.groupby('batting_team', observed=True)['dismissal_kind'].count().sort_values(ascending=False, kind='stable')
+        ),
+        'wickets_by_result': df_bowler.groupby('bowling_result', observed=True)['dismissal_kind'].count(),
+    }
+
+
+def batter_form(rolling_form, batter, innings=5):
+    return {'form': rolling_form.batter(batter, innings)}
+
+
+def bowler_form(rolling_form, bowler, matches=5):
+    return {'form': rolling_form.bowler(bowler, matches)}
+
+
+def team_form(rolling_form, team, matches=None):
+    return {'form': rolling_form.team(team, matches)}
+
+
+def matchup_analysis(matchups, batter, bowler=None, k=10, min_balls=12):
+    by_bowler = matchups.for_batter(batter, min_balls).sort_values('strike_rate', ascending=False, kind='stable')
+    result = {
+        'best_bowlers': by_bowler.head(k),
+        'worst_bowlers': by_bowler.iloc[::-1].head(k),
+        'top_matchups': matchups.top(k, min_balls),
+    }
+    if bowler is not None:
+        result['matchup'] = matchups.matchup(batter, bowler)
+        result['bunnies'] = matchups.bunnies(bowler, k)
+    return result
+
+
+def team_wins_over_years(match_cube, seasons=None):
+    return {'yearly_wins': match_cube.rollup(['season', 'winner'], seasons).reset_index(name='wins')}
+
+
+def match_summary(match_index, match_id):
+    return {
+        'match': match_index.match(match_id),
+        'scorecard': match_index.scorecard(match_id),
+    }
+
+
+def toss_impact_analysis(match_cube, seasons=None):
+    cells = match_cube.select(seasons)
+    decided = cells['toss_winner'] == cells['winner']
+    toss_decision_winners = match_cube.rollup(['toss_decision', 'winner'], seasons)
+    return {
+        'toss_winner_win_pct': cells.loc[decided, 'count'].sum() / cells['count'].sum() * 100,
+        'toss_decision_wins': toss_decision_winners.groupby(level='toss_decision').sum(),
+        'toss_decision_winners': toss_decision_winners.reset_index(),
+        'venue_toss': (
+            match_cube.rollup(['venue', 'toss_decision'], seasons)
+            .unstack(fill_value=0)
+            .sort_values(by='field', ascending=False)
+        ),
+    }
+
+
+def venue_impact_analysis(match_cube, seasons=None):
+    return {
+        'venue_matches': match_cube.rollup(['venue'], seasons).sort_values(ascending=False, kind='stable'),
+        'venue_team_wins': match_cube.rollup(['venue', 'winner'], seasons).unstack(fill_value=0),
+    }
+
+
+def seasonal_analysis(match_cube, seasons=None):
+    return {
+        'matches_per_season': match_cube.rollup(['season'], seasons),
+        'winners_per_season': match_cube.rollup(['season', 'winner'], seasons).unstack(fill_value=0),
+        'overall_winners': match_cube.rollup(['winner'], seasons).sort_values(ascending=False, kind='stable'),
+    }
+
+
+def player_of_match_analysis(df_matches):
+    return {
+        'top_pom': observed_counts(df_matches['player_of_match']).head(10),
+        'pom_season': (
+            df_matches.groupby(['season', 'player_of_match'], observed=True).size().unstack(fill_value=0)
+        ),
+    }
+
+
+def most_successful_team(match_cube, seasons=None):
+    team_wins = match_cube.rollup(['winner'], seasons).sort_values(ascending=False, kind='stable').reset_index()
+    team_wins.columns = ['Team', 'Wins']
+    return {'team_wins': team_wins}
+
+
+def season_teams(df_matches):
+    return sorted(set(df_matches['team1'].unique()) | set(df_matches['team2'].unique()))
+
+
+def season_performance(df_matches, team):
+    team_seasons = df_matches[(df_matches['team1'] == team) | (df_matches['team2'] == team)]
+    won = (team_seasons['winner'] == team).astype('int64')
+    team_season_wins = won.groupby(team_seasons['season']).sum().reset_index(name='wins')
+    return {'team_season_wins': team_season_wins}
+
+
+def head_to_head_comparison(head_to_head, team1, team2):
+    return {
+        'record': head_to_head.record(team1, team2),
+        'by_season': head_to_head.by_season(team1, team2),
+    }
+
+
+def all_head_to_heads(head_to_head):
+    return {
+        'wins': head_to_head.summary_matrix('wins'),
+        'matches': head_to_head.summary_matrix('matches'),
+    }
+
+
+def phase_match_ids(phase_stats_cube):
+    return phase_stats_cube.index.get_level_values('match_id').unique()
+
+
+def phase_teams(phase_stats_cube, match_id):
+    df_match = phase_stats_cube.xs(match_id, level='match_id')
+    return sorted(df_match.index.get_level_values('batting_team').unique())
+
+
+def phase_wise_analysis(phase_stats_cube, match_id, team):
+    df_match = phase_stats_cube.xs(match_id, level='match_id')
+    return {
+        'phase_stats': df_match.xs(team, level='batting_team').reset_index(),
+        'match_phase_stats': phase_stats_cube.loc[[match_id]].reset_index(),
+    }
+
+
+def venue_dominance(venue_wins):
+    dominant = pd.DataFrame({
+        'Dominant Team': venue_wins.idxmax(axis=1),
+        'Number of Wins': venue_wins.max(axis=1),
+    })
+    return {
+        'dominant': dominant,
+        'venues_dominated': observed_counts(dominant['Dominant Team']),
+    }
+
+
+def stadium_wise_performance(match_cube, seasons=None):
+    venue_wins = match_cube.rollup(['venue', 'winner'], seasons).unstack(fill_value=0)
+    return {'venue_wins': venue_wins, **venue_dominance(venue_wins)}
+
+
+def team_venue_wins(match_cube, team, seasons=None):
+    return match_cube.rollup(['venue'], seasons, winner=team).sort_values(ascending=False, kind='stable')
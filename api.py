@@ -0,0 +1,318 @@
+"""Read-only JSON API over the dashboard's computations.
+
+    python api.py --port 8502
+
+    GET /batters                      GET /batters/<name>
+    GET /bowlers                      GET /bowlers/<name>
+    GET /teams                        GET /head-to-head/<team1>/<team2>
+    GET /seasons                      GET /venue-impact?from=2008&to=2012
+    GET /stats                        GET /seasonal?from=2008&to=2012
+
+Responses are built from the dataset's precomputed aggregates and cached as
+encoded JSON per (endpoint, params, data version). Each carries a strong
+ETag derived from the data version and the request, so a poll with
+If-None-Match is answered 304 without building the response or touching the
+cache. Only the entity a request names is looked up first: unknown ones are
+404, whatever If-None-Match says.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import charts
+import storage
+
+DEFAULT_CACHE_MB = float(os.environ.get("IPL_API_CACHE_MB", "32"))
+
+
+class NotFound(Exception):
+    pass
+
+
+def jsonable(value):
+    """`value` with pandas and numpy objects turned into plain JSON types."""
+    if isinstance(value, pd.DataFrame):
+        return {str(row): jsonable(line) for row, line in value.to_dict(orient='index').items()}
+    if isinstance(value, (pd.Series, dict)):
+        return {str(key): jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, pd.Index)):
+        return [jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def typed_row(frame, label):
+    # frame.loc[label] upcasts a mixed row to float64; keep each column's dtype so counts stay ints
+    return {column: frame.at[label, column] for column in frame.columns}
+
+
+def encode(payload):
+    return json.dumps(jsonable(payload), separators=(',', ':')).encode()
+
+
+def season_param(query):
+    # ?from=&to= select a season range; either end defaults to the first/last season
+    first, last = query.get('from'), query.get('to')
+    if first is None and last is None:
+        return None
+    try:
+        return (int(first) if first is not None else -math.inf, int(last) if last is not None else math.inf)
+    except ValueError:
+        raise ValueError("'from' and 'to' must be seasons, e.g. ?from=2008&to=2012") from None
+
+
+def etag(data_version, endpoint, params):
+    digest = hashlib.sha1(repr((endpoint, params)).encode()).hexdigest()[:16]
+    return f'"{data_version}-{digest}"'
+
+
+def etag_matches(header, tag):
+    # If-None-Match uses weak comparison: W/ prefixes are ignored
+    if header is None:
+        return False
+    tags = [candidate.strip() for candidate in header.split(',')]
+    return '*' in tags or tag in [candidate[2:] if candidate.startswith('W/') else candidate for candidate in tags]
+
+
+class Api:
+    """Routes requests to the analytics functions for the current data version."""
+
+    ROUTES = [
+        (re.compile(r'^/batters$'), 'batters'),
+        (re.compile(r'^/batters/(?P<name>[^/]+)$'), 'batter'),
+        (re.compile(r'^/bowlers$'), 'bowlers'),
+        (re.compile(r'^/bowlers/(?P<name>[^/]+)$'), 'bowler'),
+        (re.compile(r'^/teams$'), 'teams'),
+        (re.compile(r'^/head-to-head/(?P<team1>[^/]+)/(?P<team2>[^/]+)$'), 'head_to_head'),
+        (re.compile(r'^/seasons$'), 'seasons'),
+        (re.compile(r'^/venue-impact$'), 'venue_impact'),
+        (re.compile(r'^/seasonal$'), 'seasonal'),
+    ]
+
+    def __init__(self, deliveries_path=storage.DELIVERIES_CSV, matches_path=storage.MATCHES_CSV,
+                 cache_dir=storage.CACHE_DIR, cache_bytes=int(DEFAULT_CACHE_MB * 1024 * 1024)):
+        self.paths = (deliveries_path, matches_path, cache_dir)
+        self.responses = charts.ChartCache(cache_bytes)
+        self.dataset = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+
+    def current(self):
+        """The dataset for the sources as they are now, reloaded when they change.
+
+        The reload runs outside the request lock; while one is in progress,
+        other requests are answered from the previous dataset.
+        """
+        deliveries_path, matches_path, cache_dir = self.paths
+        version = storage.data_version(deliveries_path, matches_path)
+        with self._lock:
+            dataset = self.dataset
+        if dataset is not None and dataset.data_version == version:
+            return dataset
+        if not self._reload_lock.acquire(blocking=dataset is None):
+            return dataset
+        try:
+            with self._lock:
+                dataset = self.dataset
+            # Another request may have loaded this version while we waited
+            if dataset is None or dataset.data_version != version:
+                dataset = self.warm(analytics.load_dataset(deliveries_path, matches_path, cache_dir))
+                # Responses untouched by appended matches carry over to the new version
+                self.responses.advance(
+                    dataset.data_version, lambda old, new: storage.appends_between(old, new, cache_dir)
+                )
+                with self._lock:
+                    self.dataset = dataset
+            return dataset
+        finally:
+            self._reload_lock.release()
+
+    @staticmethod
+    def warm(dataset):
+        # Build the aggregates the endpoints read before serving
+        dataset.player_index, dataset.head_to_head, dataset.match_cube
+        return dataset
+
+    def handle(self, path, query=None, if_none_match=None):
+        """(status, headers, body) for a GET of `path` with parsed `query`."""
+        with self._lock:
+            self.requests += 1
+        if path == '/stats':
+            return self._json(HTTPStatus.OK, self.stats(), {'Cache-Control': 'no-store'})
+        for pattern, endpoint in self.ROUTES:
+            match = pattern.match(path)
+            if match is not None:
+                break
+        else:
+            return self._error(HTTPStatus.NOT_FOUND, f"No endpoint {path}")
+        try:
+            args = tuple(unquote(value) for value in match.groups())
+            if endpoint in ('venue_impact', 'seasonal'):
+                args += (season_param(query or {}),)
+        except ValueError as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e))
+
+        dataset = self.current()
+        try:
+            # Unknown entities are 404 whatever If-None-Match says, so * only matches existing ones
+            self.check(dataset, endpoint, args)
+        except NotFound as e:
+            return self._error(HTTPStatus.NOT_FOUND, str(e))
+        tag = etag(dataset.data_version, endpoint, args)
+        headers = {'ETag': tag, 'Cache-Control': 'no-cache'}
+        if etag_matches(if_none_match, tag):
+            with self._lock:
+                self.not_modified += 1
+            return HTTPStatus.NOT_MODIFIED, headers, b''
+        key = (endpoint, args, dataset.data_version)
+        body = self.responses.get_or_render(
+            key, lambda: getattr(self, endpoint)(dataset, *args), encode, 'json', self.depends(endpoint, args)
+        )
+        return HTTPStatus.OK, {**headers, 'Content-Type': 'application/json'}, body
+
+    @staticmethod
+    def check(dataset, endpoint, args):
+        # Raise NotFound if the entity a request names is not in the dataset
+        if endpoint == 'batter' and args[0] not in dataset.player_index.batting.index:
+            raise NotFound(f"Unknown batter {args[0]!r}")
+        if endpoint == 'bowler' and args[0] not in dataset.player_index.bowling.index:
+            raise NotFound(f"Unknown bowler {args[0]!r}")
+        if endpoint == 'head_to_head':
+            played = set(dataset.head_to_head.played_teams())
+            for team in args:
+                if team not in played:
+                    raise NotFound(f"Unknown team {team!r}")
+
+    @staticmethod
+    def depends(endpoint, args):
+        # Which appends invalidate a cached response; lists and unfiltered tables depend on all of them
+        if endpoint in ('batter', 'bowler'):
+            return charts.depends_on(players=args)
+        if endpoint == 'head_to_head':
+            return charts.depends_on(teams=args)
+        if endpoint in ('venue_impact', 'seasonal') and args[0] is not None:
+            return charts.depends_on(seasons=args[0])
+        return None
+
+    def _json(self, status, payload, headers=None):
+        return status, {'Content-Type': 'application/json', **(headers or {})}, encode(payload)
+
+    def _error(self, status, message):
+        return self._json(status, {'error': message}, {'Cache-Control': 'no-store'})
+
+    def stats(self):
+        with self._lock:
+            return {
+                'data_version': self.dataset.data_version if self.dataset is not None else None,
+                'requests': self.requests,
+                'not_modified': self.not_modified,
+                'cache': self.responses.stats(),
+            }
+
+    # Endpoints: each returns the payload for one response
+
+    def batters(self, dataset):
+        return dataset.player_index.batters()
+
+    def bowlers(self, dataset):
+        return dataset.player_index.bowlers()
+
+    def teams(self, dataset):
+        return dataset.head_to_head.played_teams()
+
+    def seasons(self, dataset):
+        return dataset.match_cube.seasons()
+
+    def batter(self, dataset, name):
+        result = analytics.batter_analysis(dataset.player_index, name)
+        return {**result, 'metrics': typed_row(dataset.player_index.batting, name)}
+
+    def bowler(self, dataset, name):
+        result = analytics.bowler_analysis(dataset.player_index, name)
+        return {**result, 'metrics': typed_row(dataset.player_index.bowling, name)}
+
+    def head_to_head(self, dataset, team1, team2):
+        return analytics.head_to_head_comparison(dataset.head_to_head, team1, team2)
+
+    def venue_impact(self, dataset, seasons):
+        return analytics.venue_impact_analysis(dataset.match_cube, seasons)
+
+    def seasonal(self, dataset, seasons):
+        return analytics.seasonal_analysis(dataset.match_cube, seasons)
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "IPLAnalysisAPI/1.0"
+
+    def _respond(self, send_body):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        status, headers, body = self.server.api.handle(url.path, query, self.headers.get('If-None-Match'))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body and status != HTTPStatus.NOT_MODIFIED:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def serve(api, host='127.0.0.1', port=8502, quiet=False):
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.api = api
+    server.quiet = quiet
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard's aggregates as read-only JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--deliveries", default=storage.DELIVERIES_CSV)
+    parser.add_argument("--matches", default=storage.MATCHES_CSV)
+    parser.add_argument("--cache-dir", default=storage.CACHE_DIR)
+    parser.add_argument("--quiet", action="store_true", help="don't log each request")
+    args = parser.parse_args(argv)
+
+    api = Api(args.deliveries, args.matches, args.cache_dir)
+    dataset = api.current()
+    server = serve(api, args.host, args.port, args.quiet)
+    print(f"Serving data version {dataset.data_version} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
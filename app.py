@@ -1,167 +1,283 @@
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import json
 
-st.set_page_config(page_title="IPL Analysis", layout="wide")
-sns.set_style("whitegrid")
+import pandas as pd
+import streamlit as st
 
-@st.cache_data
-def load_data():
-    try:
-        df_deliveries = pd.read_csv("data/deliveries.csv")
-        df_matches = pd.read_csv("data/matches.csv")
-    except FileNotFoundError as e:
-        st.error(f"Error loading data: {e}")
-        return None, None
-
-    df_deliveries.columns = df_deliveries.columns.str.strip().str.lower()
-    df_matches.columns = df_matches.columns.str.strip().str.lower()
-
-    # Standardize column names
-    if 'striker' in df_deliveries.columns:
-        df_deliveries.rename(columns={'striker': 'batter'}, inplace=True)
-    if 'batsman' in df_deliveries.columns:
-        df_deliveries.rename(columns={'batsman': 'batter'}, inplace=True)
-    if 'batsman_runs' in df_deliveries.columns:
-        df_deliveries.rename(columns={'batsman_runs': 'batter_runs'}, inplace=True)
-
-    return df_deliveries, df_matches
-
-def batter_analysis(df_deliveries, df_matches):
+import analytics
+import backends
+import charts
+import instrumentation
+import prewarm
+import resources
+import storage
+# Imported on first draw, not with the app
+from charts import plt, sns
+
+# Sessions share one dataset; copy-on-write (the default from pandas 3) keeps
+# their shallow copies from writing through to it
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def show_chart(chart, params, draw, depends=None):
+    # depends (charts.depends_on) says which appended matches invalidate the
+    # chart; None means any
+    key = (chart, params, st.session_state.get('data_version'))
+    def render():
+        # Only cache misses draw, so only they show up as render spans
+        with instrumentation.span(f"render.{chart}"):
+            return draw()
+    st.image(charts.chart_cache.get_or_render(key, render, depends=depends), width="stretch")
+
+def show_heatmap(chart, params, matrix, title, xlabel, ylabel, cmap, figsize, others, depends=None,
+                 bound_columns=False):
+    # NaN cells are left blank; bound_columns also caps the columns (square matrices)
+    matrix, folded = charts.bound_rows(matrix)
+    if folded:
+        st.caption(f"Showing the {len(matrix) - 1} {others} with the highest totals; "
+                   f"the other {folded} are summed into one row.")
+    if bound_columns:
+        matrix, folded = charts.bound_rows(matrix.T)
+        matrix = matrix.T
+        if folded:
+            st.caption(f"Likewise {len(matrix.columns) - 1} columns are shown and the other {folded} summed into one.")
+    if not st.session_state.get('interactive_heatmaps'):
+        def draw():
+            fig, ax = plt.subplots(figsize=figsize)
+            charts.heatmap(matrix, ax, cmap)
+            ax.set_title(title)
+            ax.set_xlabel(xlabel)
+            ax.set_ylabel(ylabel)
+            return fig
+        show_chart(chart, params, draw, depends)
+        return
+    # The browser draws the spec; only the cell values are sent
+    key = (chart + ".spec", params, st.session_state.get('data_version'))
+    def build():
+        with instrumentation.span(f"render.{chart}.spec"):
+            return charts.heatmap_spec(matrix, title, xlabel, ylabel, cmap)
+    spec = charts.chart_cache.get_or_render(key, build, charts.encode_spec, 'vega-lite', depends)
+    st.vega_lite_chart(spec=json.loads(spec), width="stretch")
+
+def compute(func, *args):
+    with instrumentation.span(f"compute.{func.__name__}") as span:
+        result = func(*args)
+        if span.active:
+            span.set_rows(instrumentation.result_rows(result))
+    return result
+
+def aggregate(dataset, name):
+    with instrumentation.span(f"aggregate.{name}"):
+        return getattr(dataset, name)
+
+def performance_panel(trace):
+    with st.sidebar.expander("Performance", expanded=True):
+        spans = trace.frame()
+        st.write(f"{trace.label}: {spans.loc[spans['depth'] == 0, 'ms'].sum():.1f} ms")
+        spans['name'] = ['\u2003' * depth + name for depth, name in zip(spans['depth'], spans['name'])]
+        st.dataframe(spans[['name', 'ms', 'rows', 'rss_delta_bytes']], hide_index=True)
+        st.download_button("Download spans (JSON lines)", trace.to_jsonl(), file_name=f"trace-{trace.id}.jsonl")
+
+def batter_analysis(backend, rolling_form=None):
     st.header("Batter Performance Analysis")
-    batters = df_deliveries['batter'].unique()
-    selected_batter = st.selectbox("Select a Batter", sorted(batters))
+    selected_batter = st.selectbox("Select a Batter", backend.batters())
 
-    df_batter = df_deliveries[df_deliveries['batter'] == selected_batter]
-    total_runs = df_batter['batter_runs'].sum()
-    total_balls = df_batter.shape[0]
-    total_fours = df_batter[df_batter['batter_runs'] == 4].shape[0]
-    total_sixes = df_batter[df_batter['batter_runs'] == 6].shape[0]
-    strike_rate = round((total_runs / total_balls) * 100, 2) if total_balls > 0 else 0
+    result = compute(backend.batter_analysis, selected_batter)
+    stats = result['metrics']
 
     col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("Total Runs", total_runs)
-    col2.metric("Balls Faced", total_balls)
-    col3.metric("4s", total_fours)
-    col4.metric("6s", total_sixes)
-    col5.metric("Strike Rate", strike_rate)
-
-    fig, ax = plt.subplots()
-    df_batter['batter_runs'].value_counts().sort_index().plot(kind='bar', ax=ax)
-    ax.set_title("Runs Scored Distribution")
-    ax.set_xlabel("Runs per Ball")
-    ax.set_ylabel("Count")
-    st.pyplot(fig)
+    col1.metric("Total Runs", int(stats['total_runs']))
+    col2.metric("Balls Faced", int(stats['total_balls']))
+    col3.metric("4s", int(stats['total_fours']))
+    col4.metric("6s", int(stats['total_sixes']))
+    col5.metric("Strike Rate", float(stats['strike_rate']))
+
+    def draw_fig():
+        fig, ax = plt.subplots()
+        result['runs_distribution'].plot(kind='bar', ax=ax)
+        ax.set_title("Runs Scored Distribution")
+        ax.set_xlabel("Runs per Ball")
+        ax.set_ylabel("Count")
+        return fig
+    depends = charts.depends_on(players=[selected_batter])
+    show_chart("batter_analysis.fig", (selected_batter,), draw_fig, depends)
 
     # Runs scored against different teams
     st.subheader("Runs Scored Against Each Team")
-    merged_batter = df_batter.merge(df_matches[['id', 'team1', 'team2']], left_on='match_id', right_on='id', how='left')
-    merged_batter['opponent'] = merged_batter.apply(
-        lambda row: row['team2'] if row['team1'] == selected_batter else row['team1'], axis=1
-    )
-    runs_vs_opponent = merged_batter.groupby('opponent')['batter_runs'].sum().sort_values(ascending=False)
-    fig_opponent, ax_opponent = plt.subplots()
-    runs_vs_opponent.plot(kind='bar', ax=ax_opponent)
-    ax_opponent.set_title(f"Runs Scored by {selected_batter} Against Each Team")
-    ax_opponent.set_xlabel("Opponent Team")
-    ax_opponent.set_ylabel("Total Runs")
-    st.pyplot(fig_opponent)
+    runs_vs_opponent = result['runs_vs_opponent']
+    def draw_fig_opponent():
+        fig_opponent, ax_opponent = plt.subplots()
+        runs_vs_opponent.plot(kind='bar', ax=ax_opponent)
+        ax_opponent.set_title(f"Runs Scored by {selected_batter} Against Each Team")
+        ax_opponent.set_xlabel("Opponent Team")
+        ax_opponent.set_ylabel("Total Runs")
+        return fig_opponent
+    show_chart("batter_analysis.fig_opponent", (selected_batter,), draw_fig_opponent, depends)
 
     # Performance in winning vs losing matches
     st.subheader("Performance in Winning vs Losing Matches")
-    merged_win_loss = df_batter.merge(df_matches[['id', 'winner']], left_on='match_id', right_on='id', how='left')
-    merged_win_loss['match_result'] = merged_win_loss.apply(
-        lambda row: 'Won' if row['winner'] == selected_batter else ('Lost' if pd.notna(row['winner']) else 'No Result'), axis=1
-    )
-    runs_win_loss = merged_win_loss.groupby('match_result')['batter_runs'].sum()
-    fig_win_loss, ax_win_loss = plt.subplots()
-    runs_win_loss.plot(kind='bar', ax=ax_win_loss)
-    ax_win_loss.set_title(f"Runs Scored by {selected_batter} in Winning vs Losing Matches")
-    ax_win_loss.set_xlabel("Match Result")
-    ax_win_loss.set_ylabel("Total Runs")
-    st.pyplot(fig_win_loss)
-
-def bowler_analysis(df_deliveries, df_matches):
+    runs_win_loss = result['runs_by_result']
+    def draw_fig_win_loss():
+        fig_win_loss, ax_win_loss = plt.subplots()
+        runs_win_loss.plot(kind='bar', ax=ax_win_loss)
+        ax_win_loss.set_title(f"Runs Scored by {selected_batter} in Winning vs Losing Matches")
+        ax_win_loss.set_xlabel("Match Result")
+        ax_win_loss.set_ylabel("Total Runs")
+        return fig_win_loss
+    show_chart("batter_analysis.fig_win_loss", (selected_batter,), draw_fig_win_loss, depends)
+
+    if rolling_form is None:
+        return
+    # Form over the last N innings
+    st.subheader("Recent Form")
+    innings = st.slider("Innings in the rolling window", min_value=1, max_value=20, value=5)
+    form = compute(analytics.batter_form, rolling_form, selected_batter, innings)['form']
+    def draw_fig_form():
+        fig_form, ax_runs = plt.subplots(figsize=(12, 5))
+        x = range(1, len(form) + 1)
+        ax_runs.plot(x, form['form_runs'], color='tab:blue', label="Runs")
+        ax_runs.set_xlabel("Innings")
+        ax_runs.set_ylabel(f"Runs in Last {innings} Innings")
+        ax_sr = ax_runs.twinx()
+        ax_sr.plot(x, form['form_strike_rate'], color='tab:orange', label="Strike Rate")
+        ax_sr.set_ylabel("Strike Rate")
+        ax_runs.set_title(f"{selected_batter}'s Rolling Form ({innings} Innings)")
+        fig_form.legend(loc='upper left')
+        return fig_form
+    show_chart("batter_analysis.fig_form", (selected_batter, innings), draw_fig_form, depends)
+
+def bowler_analysis(backend, rolling_form=None):
     st.header("Bowler Performance Analysis")
-    bowlers = df_deliveries['bowler'].unique()
-    selected_bowler = st.selectbox("Select a Bowler", sorted(bowlers))
+    selected_bowler = st.selectbox("Select a Bowler", backend.bowlers())
 
-    df_bowler = df_deliveries[df_deliveries['bowler'] == selected_bowler]
-    total_balls = df_bowler.shape[0]
-    total_runs_conceded = df_bowler['total_runs'].sum()
-    total_wickets = df_bowler[df_bowler['dismissal_kind'].notna()].shape[0]
-    economy = round((total_runs_conceded / (total_balls / 6)), 2) if total_balls > 0 else 0
-    strike_rate_bowling = round(total_balls / total_wickets, 2) if total_wickets > 0 else 0
-    average = round(total_runs_conceded / total_wickets, 2) if total_wickets > 0 else 0
+    result = compute(backend.bowler_analysis, selected_bowler)
+    stats = result['metrics']
 
     col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("Balls Bowled", total_balls)
-    col2.metric("Runs Conceded", total_runs_conceded)
-    col3.metric("Wickets", total_wickets)
-    col4.metric("Economy Rate", economy)
-    col5.metric("Bowling Strike Rate", strike_rate_bowling)
+    col1.metric("Balls Bowled", int(stats['total_balls']))
+    col2.metric("Runs Conceded", int(stats['runs_conceded']))
+    col3.metric("Wickets", int(stats['total_wickets']))
+    col4.metric("Economy Rate", float(stats['economy']))
+    col5.metric("Bowling Strike Rate", float(stats['strike_rate']))
 
     col_avg = st.columns(1)
-    col_avg[0].metric("Bowling Average", average)
+    col_avg[0].metric("Bowling Average", float(stats['average']))
 
-    fig, ax = plt.subplots()
-    df_bowler['total_runs'].hist(bins=20, ax=ax)
-    ax.set_title("Runs Conceded per Delivery")
-    ax.set_xlabel("Runs")
-    ax.set_ylabel("Frequency")
-    st.pyplot(fig)
+    runs_hist = result['runs_distribution']
+    def draw_fig():
+        fig, ax = plt.subplots()
+        ax.hist(runs_hist.index, weights=runs_hist.values, bins=20)
+        ax.set_title("Runs Conceded per Delivery")
+        ax.set_xlabel("Runs")
+        ax.set_ylabel("Frequency")
+        return fig
+    depends = charts.depends_on(players=[selected_bowler])
+    show_chart("bowler_analysis.fig", (selected_bowler,), draw_fig, depends)
 
     # Wickets taken against different teams
     st.subheader("Wickets Taken Against Each Team")
-    dismissals_bowler = df_bowler.dropna(subset=['dismissal_kind'])
-    merged_bowler = dismissals_bowler.merge(df_matches[['id', 'team1', 'team2']], left_on='match_id', right_on='id', how='left')
-    merged_bowler['opponent'] = merged_bowler.apply(
-        lambda row: row['team2'] if row['team1'] == row['bowling_team'] else row['team1'], axis=1
-    )
-    wickets_vs_opponent = merged_bowler.groupby('opponent')['dismissal_kind'].count().sort_values(ascending=False)
-    fig_wicket_opponent, ax_wicket_opponent = plt.subplots()
-    wickets_vs_opponent.plot(kind='bar', ax=ax_wicket_opponent)
-    ax_wicket_opponent.set_title(f"Wickets Taken by {selected_bowler} Against Each Team")
-    ax_wicket_opponent.set_xlabel("Opponent Team")
-    ax_wicket_opponent.set_ylabel("Total Wickets")
-    st.pyplot(fig_wicket_opponent)
+    wickets_vs_opponent = result['wickets_vs_opponent']
+    def draw_fig_wicket_opponent():
+        fig_wicket_opponent, ax_wicket_opponent = plt.subplots()
+        wickets_vs_opponent.plot(kind='bar', ax=ax_wicket_opponent)
+        ax_wicket_opponent.set_title(f"Wickets Taken by {selected_bowler} Against Each Team")
+        ax_wicket_opponent.set_xlabel("Opponent Team")
+        ax_wicket_opponent.set_ylabel("Total Wickets")
+        return fig_wicket_opponent
+    show_chart("bowler_analysis.fig_wicket_opponent", (selected_bowler,), draw_fig_wicket_opponent, depends)
 
     # Performance in winning vs losing matches
     st.subheader("Performance in Winning vs Losing Matches")
-    merged_bowl_win_loss = df_bowler.merge(df_matches[['id', 'winner']], left_on='match_id', right_on='id', how='left')
-    merged_bowl_win_loss['match_result'] = merged_bowl_win_loss.apply(
-        lambda row: 'Won' if row['winner'] == row['bowling_team'] else ('Lost' if pd.notna(row['winner']) else 'No Result'), axis=1
-    )
-    wickets_win_loss = merged_bowl_win_loss.groupby('match_result')['dismissal_kind'].count()
-    fig_bowl_win_loss, ax_bowl_win_loss = plt.subplots()
-    wickets_win_loss.plot(kind='bar', ax=ax_bowl_win_loss)
-    ax_bowl_win_loss.set_title(f"Wickets Taken by {selected_bowler} in Winning vs Losing Matches")
-    ax_bowl_win_loss.set_xlabel("Match Result")
-    ax_bowl_win_loss.set_ylabel("Total Wickets")
-    st.pyplot(fig_bowl_win_loss)
-
-def team_wins_over_years(df_matches):
+    wickets_win_loss = result['wickets_by_result']
+    def draw_fig_bowl_win_loss():
+        fig_bowl_win_loss, ax_bowl_win_loss = plt.subplots()
+        wickets_win_loss.plot(kind='bar', ax=ax_bowl_win_loss)
+        ax_bowl_win_loss.set_title(f"Wickets Taken by {selected_bowler} in Winning vs Losing Matches")
+        ax_bowl_win_loss.set_xlabel("Match Result")
+        ax_bowl_win_loss.set_ylabel("Total Wickets")
+        return fig_bowl_win_loss
+    show_chart("bowler_analysis.fig_bowl_win_loss", (selected_bowler,), draw_fig_bowl_win_loss, depends)
+
+    if rolling_form is None:
+        return
+    # Economy over the last N matches
+    st.subheader("Recent Form")
+    matches = st.slider("Matches in the rolling window", min_value=1, max_value=20, value=5)
+    form = compute(analytics.bowler_form, rolling_form, selected_bowler, matches)['form']
+    def draw_fig_form():
+        fig_form, ax_form = plt.subplots(figsize=(12, 5))
+        ax_form.plot(range(1, len(form) + 1), form['form_economy'])
+        ax_form.set_title(f"{selected_bowler}'s Economy Over the Last {matches} Matches")
+        ax_form.set_xlabel("Match")
+        ax_form.set_ylabel("Economy Rate")
+        return fig_form
+    show_chart("bowler_analysis.fig_form", (selected_bowler, matches), draw_fig_form, depends)
+
+def matchup_analysis(matchups):
+    st.header("Batter vs Bowler Matchups")
+    selected_batter = st.selectbox("Select a Batter", matchups.batters())
+    faced = matchups.for_batter(selected_batter)['bowler']
+    selected_bowler = st.selectbox("Select a Bowler", faced)
+    min_balls = st.slider("Minimum balls per matchup", min_value=1, max_value=60, value=12)
+    k = st.slider("Number of matchups to list", min_value=3, max_value=25, value=10)
+
+    result = compute(analytics.matchup_analysis, matchups, selected_batter, selected_bowler, k, min_balls)
+    matchup = result['matchup']
+
+    st.subheader(f"{selected_batter} vs {selected_bowler}")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Balls", int(matchup['balls']))
+    col2.metric("Runs", int(matchup['runs']))
+    col3.metric("Dismissals", int(matchup['dismissals']))
+    col4.metric("4s / 6s", f"{int(matchup['fours'])} / {int(matchup['sixes'])}")
+    col5.metric("Strike Rate", float(matchup['strike_rate']))
+
+    columns = ['bowler', 'balls', 'runs', 'dismissals', 'strike_rate', 'average']
+    col_best, col_worst = st.columns(2)
+    col_best.subheader(f"Bowlers {selected_batter} Scores Fastest Against")
+    col_best.dataframe(result['best_bowlers'][columns], hide_index=True)
+    col_worst.subheader(f"Bowlers {selected_batter} Scores Slowest Against")
+    col_worst.dataframe(result['worst_bowlers'][columns], hide_index=True)
+
+    st.subheader(f"Batters Dismissed Most by {selected_bowler}")
+    st.dataframe(result['bunnies'][['batter', 'balls', 'runs', 'dismissals', 'average']], hide_index=True)
+
+    st.subheader(f"Top {k} Matchups by Strike Rate (min {min_balls} balls)")
+    top_matchups = result['top_matchups']
+    st.dataframe(top_matchups, hide_index=True)
+    def draw_fig():
+        fig, ax = plt.subplots(figsize=(10, 6))
+        labels = top_matchups['batter'].astype(str) + " v " + top_matchups['bowler'].astype(str)
+        ax.barh(labels[::-1], top_matchups['strike_rate'][::-1])
+        ax.set_title("Highest Strike Rate Matchups")
+        ax.set_xlabel("Strike Rate")
+        ax.set_ylabel("Batter v Bowler")
+        return fig
+    # Ranked over every pair, so any append may change it
+    show_chart("matchup_analysis.fig", (k, min_balls), draw_fig, depends=None)
+
+def team_wins_over_years(match_cube, seasons):
     st.header("Team Wins Over the Years")
-    df_win = df_matches[df_matches['winner'].notna()]
-    df_yearly_wins = df_win.groupby(['season', 'winner']).size().reset_index(name='wins')
+    df_yearly_wins = compute(analytics.team_wins_over_years, match_cube, seasons)['yearly_wins']
 
-    fig, ax = plt.subplots(figsize=(12, 6))
-    sns.lineplot(data=df_yearly_wins, x='season', y='wins', hue='winner', marker='o', ax=ax)
-    ax.set_title("Team Wins by Season")
-    ax.set_xlabel("Season")
-    ax.set_ylabel("Wins")
-    plt.xticks(rotation=45)
-    st.pyplot(fig)
+    def draw_fig():
+        fig, ax = plt.subplots(figsize=(12, 6))
+        sns.lineplot(data=df_yearly_wins, x='season', y='wins', hue='winner', marker='o', ax=ax)
+        ax.set_title("Team Wins by Season")
+        ax.set_xlabel("Season")
+        ax.set_ylabel("Wins")
+        ax.tick_params(axis='x', rotation=45)
+        return fig
+    show_chart("team_wins_over_years.fig", (seasons,), draw_fig, charts.depends_on(seasons=seasons))
 
 
 
-def match_summary(df_matches):
+def match_summary(match_index):
     st.header("Match Summary")
-    match_ids = df_matches['id'].unique()
+    match_ids = match_index.matches.index
     match_id = st.selectbox("Select a Match ID", match_ids)
 
-    match = df_matches[df_matches['id'] == match_id].iloc[0]
+    result = compute(analytics.match_summary, match_index, match_id)
+    match = result['match']
     st.subheader(f"{match['team1']} vs {match['team2']}")
     st.text(f"Date: {match['date']}")
     st.text(f"Venue: {match['venue']}")
@@ -170,169 +286,213 @@ def match_summary(df_matches):
     st.text(f"Player of the Match: {match['player_of_match']}")
     st.text(f"Umpires: {match['umpire1']}, {match['umpire2']}")
 
+    st.subheader("Ball-by-ball Scorecard")
+    scorecard = result['scorecard']
+    if scorecard.empty:
+        st.info("No ball-by-ball data for this match.")
+        return
+    for inning, innings in scorecard.groupby('inning'):
+        st.markdown(f"**Innings {inning}: {innings['batting_team'].iloc[0]} {innings['score'].iloc[-1]}**")
+        st.dataframe(innings.drop(columns=['inning', 'batting_team']), hide_index=True)
+
 
 
-def toss_impact_analysis(df_matches):
+def toss_impact_analysis(match_cube, seasons):
     st.header("Toss Impact Analysis")
-    toss_winner_wins = (df_matches['toss_winner'] == df_matches['winner']).mean() * 100
+    result = compute(analytics.toss_impact_analysis, match_cube, seasons)
+    toss_winner_wins = result['toss_winner_win_pct']
     st.write(f"Percentage of times toss winner also won the match: {toss_winner_wins:.2f}%")
-    toss_decision_wins = df_matches.groupby('toss_decision')['winner'].count()
-    fig, ax = plt.subplots()
-    ax.pie(toss_decision_wins, labels=toss_decision_wins.index, autopct='%1.1f%%')
-    ax.set_title("Toss Decision and Wins")
-    st.pyplot(fig)
-    fig, ax = plt.subplots()
-    sns.countplot(data=df_matches, x='toss_decision', hue='winner', ax=ax)
-    plt.xticks(rotation=45)
-    ax.set_title("Toss Decision vs Match Winner")
-    st.pyplot(fig)
+    toss_decision_wins = result['toss_decision_wins']
+    toss_decision_winners = result['toss_decision_winners'].astype({'winner': str})
+    def draw_fig():
+        fig, ax = plt.subplots()
+        ax.pie(toss_decision_wins, labels=toss_decision_wins.index, autopct='%1.1f%%')
+        ax.set_title("Toss Decision and Wins")
+        return fig
+    depends = charts.depends_on(seasons=seasons)
+    show_chart("toss_impact_analysis.fig", (seasons,), draw_fig, depends)
+    def draw_fig_2():
+        fig, ax = plt.subplots()
+        sns.barplot(data=toss_decision_winners, x='toss_decision', y='count', hue='winner', ax=ax)
+        ax.tick_params(axis='x', rotation=45)
+        ax.set_title("Toss Decision vs Match Winner")
+        return fig
+    show_chart("toss_impact_analysis.fig_2", (seasons,), draw_fig_2, depends)
     st.write("Number of matches won by each toss decision:")
     st.write(toss_decision_wins)
 
     st.subheader("Toss Decision by Venue")
-    venue_toss = df_matches.groupby('venue')['toss_decision'].value_counts().unstack(fill_value=0).sort_values(by='field', ascending=False)
+    venue_toss = result['venue_toss']
     st.write(venue_toss)
-    fig_venue_toss, ax_venue_toss = plt.subplots(figsize=(10, 6))
-    venue_toss.plot(kind='bar', stacked=True, ax=ax_venue_toss)
-    ax_venue_toss.set_title("Toss Decision Distribution by Venue")
-    ax_venue_toss.set_xlabel("Venue")
-    ax_venue_toss.set_ylabel("Number of Tosses")
-    st.pyplot(fig_venue_toss)
+    def draw_fig_venue_toss():
+        fig_venue_toss, ax_venue_toss = plt.subplots(figsize=(10, 6))
+        venue_toss.plot(kind='bar', stacked=True, ax=ax_venue_toss)
+        ax_venue_toss.set_title("Toss Decision Distribution by Venue")
+        ax_venue_toss.set_xlabel("Venue")
+        ax_venue_toss.set_ylabel("Number of Tosses")
+        return fig_venue_toss
+    show_chart("toss_impact_analysis.fig_venue_toss", (seasons,), draw_fig_venue_toss, depends)
 
 
 
-def venue_impact_analysis(df_matches):
+def venue_impact_analysis(match_cube, seasons):
     st.header("Venue Impact Analysis")
-    venue_wins = df_matches['venue'].value_counts().head(10)
-    fig, ax = plt.subplots()
-    venue_wins.plot(kind='bar', ax=ax)
-    ax.set_title("Top 10 Venues by Number of Matches")
-    ax.set_xlabel("Venue")
-    ax.set_ylabel("Number of Matches")
-    st.pyplot(fig)
+    result = compute(analytics.venue_impact_analysis, match_cube, seasons)
+    venue_matches = result['venue_matches']
+    venue_wins = venue_matches.head(10)
+    def draw_fig():
+        fig, ax = plt.subplots()
+        venue_wins.plot(kind='bar', ax=ax)
+        ax.set_title("Top 10 Venues by Number of Matches")
+        ax.set_xlabel("Venue")
+        ax.set_ylabel("Number of Matches")
+        return fig
+    depends = charts.depends_on(seasons=seasons)
+    show_chart("venue_impact_analysis.fig", (seasons,), draw_fig, depends)
     st.write("Number of matches played at each venue:")
-    st.write(df_matches['venue'].value_counts())
+    st.write(venue_matches)
 
     st.subheader("Wins by Team at Each Venue")
-    venue_team_wins = df_matches.groupby('venue')['winner'].value_counts().unstack(fill_value=0)
+    venue_team_wins = result['venue_team_wins']
     st.write(venue_team_wins)
-    fig_venue_team, ax_venue_team = plt.subplots(figsize=(12, 8))
-    sns.heatmap(venue_team_wins, cmap='YlGnBu', annot=True, fmt='g', ax=ax_venue_team)
-    ax_venue_team.set_title("Wins by Team at Each Venue")
-    st.pyplot(fig_venue_team)
+    show_heatmap("venue_impact_analysis.fig_venue_team", (seasons,), venue_team_wins,
+                 "Wins by Team at Each Venue", "Team", "Venue", 'YlGnBu', (12, 8), "venues", depends)
 
-def seasonal_analysis(df_matches):
+def seasonal_analysis(match_cube, seasons):
     st.header("Seasonal Analysis")
-    matches_per_season = df_matches['season'].value_counts().sort_index()
+    result = compute(analytics.seasonal_analysis, match_cube, seasons)
+    matches_per_season = result['matches_per_season']
     st.write("Number of matches per season:")
     st.write(matches_per_season)
-    fig, ax = plt.subplots()
-    matches_per_season.plot(kind='bar', ax=ax)
-    ax.set_title("Matches per Season")
-    ax.set_xlabel("Season")
-    ax.set_ylabel("Number of Matches")
-    st.pyplot(fig)
-
-    winners_per_season = df_matches.groupby('season')['winner'].value_counts().unstack(fill_value=0)
+    def draw_fig():
+        fig, ax = plt.subplots()
+        matches_per_season.plot(kind='bar', ax=ax)
+        ax.set_title("Matches per Season")
+        ax.set_xlabel("Season")
+        ax.set_ylabel("Number of Matches")
+        return fig
+    depends = charts.depends_on(seasons=seasons)
+    show_chart("seasonal_analysis.fig", (seasons,), draw_fig, depends)
+
+    winners_per_season = result['winners_per_season']
     st.write("Winners per season:")
     st.write(winners_per_season)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    winners_per_season.plot(kind='bar', stacked=True, ax=ax)
-    ax.set_title("Winners per Season")
-    ax.set_xlabel("Season")
-    ax.set_ylabel("Number of Wins")
-    plt.legend(title='Team')
-    plt.xticks(rotation=45)
-    st.pyplot(fig)
+    def draw_fig_2():
+        fig, ax = plt.subplots(figsize=(10, 6))
+        winners_per_season.plot(kind='bar', stacked=True, ax=ax)
+        ax.set_title("Winners per Season")
+        ax.set_xlabel("Season")
+        ax.set_ylabel("Number of Wins")
+        ax.legend(title='Team')
+        ax.tick_params(axis='x', rotation=45)
+        return fig
+    show_chart("seasonal_analysis.fig_2", (seasons,), draw_fig_2, depends)
 
     st.subheader("Most Successful Teams Over All Seasons")
-    overall_winners = df_matches['winner'].value_counts()
+    overall_winners = result['overall_winners']
     st.write("Most Successful Teams Over All Seasons:")
     st.write(overall_winners)
-    fig_overall_win, ax_overall_win = plt.subplots()
-    overall_winners.plot(kind='bar', ax=ax_overall_win)
-    ax_overall_win.set_title("Most Successful Teams Over All Seasons")
-    ax_overall_win.set_xlabel("Team")
-    ax_overall_win.set_ylabel("Total Wins")
-    st.pyplot(fig_overall_win)
+    def draw_fig_overall_win():
+        fig_overall_win, ax_overall_win = plt.subplots()
+        overall_winners.plot(kind='bar', ax=ax_overall_win)
+        ax_overall_win.set_title("Most Successful Teams Over All Seasons")
+        ax_overall_win.set_xlabel("Team")
+        ax_overall_win.set_ylabel("Total Wins")
+        return fig_overall_win
+    show_chart("seasonal_analysis.fig_overall_win", (seasons,), draw_fig_overall_win, depends)
 
 
 
 def player_of_match_analysis(df_matches):
     st.header("Player of the Match Analysis")
-    top_pom = df_matches['player_of_match'].value_counts().head(10)
+    result = compute(analytics.player_of_match_analysis, df_matches)
+    top_pom = result['top_pom']
     st.write("Top 10 Player of the Match Winners:")
     st.write(top_pom)
-    fig, ax = plt.subplots()
-    top_pom.plot(kind='bar', ax=ax)
-    ax.set_title("Top 10 Player of the Match Winners")
-    ax.set_xlabel("Player")
-    ax.set_ylabel("Number of Awards")
-    st.pyplot(fig)
+    def draw_fig():
+        fig, ax = plt.subplots()
+        top_pom.plot(kind='bar', ax=ax)
+        ax.set_title("Top 10 Player of the Match Winners")
+        ax.set_xlabel("Player")
+        ax.set_ylabel("Number of Awards")
+        return fig
+    show_chart("player_of_match_analysis.fig", (), draw_fig)
 
     st.subheader("Player of the Match Awards Season-wise")
-    pom_season = df_matches.groupby('season')['player_of_match'].value_counts().unstack(fill_value=0)
+    pom_season = result['pom_season']
     st.write("Player of the Match Awards per Season:")
     st.write(pom_season)
-    fig_pom_season, ax_pom_season = plt.subplots(figsize=(12, 8))
-    sns.heatmap(pom_season, cmap='viridis', annot=True, fmt='g', ax=ax_pom_season)
-    ax_pom_season.set_title("Player of the Match Awards per Season")
-    ax_pom_season.set_xlabel("Season")
-    ax_pom_season.set_ylabel("Player")
-    st.pyplot(fig_pom_season)
+    show_heatmap("player_of_match_analysis.fig_pom_season", (), pom_season.T,
+                 "Player of the Match Awards per Season", "Season", "Player", 'viridis', (12, 8), "players")
 
 
 
-def most_successful_team(df_matches):
+def most_successful_team(match_cube, seasons):
     st.header("Most Successful Team Analysis")
-    team_wins = df_matches['winner'].value_counts().reset_index()
-    team_wins.columns = ['Team', 'Wins']
+    team_wins = compute(analytics.most_successful_team, match_cube, seasons)['team_wins']
     most_successful = team_wins.iloc[0]
 
     st.write(f"The most successful team in IPL so far is **{most_successful['Team']}** with **{most_successful['Wins']}** wins.")
 
-    fig, ax = plt.subplots()
-    sns.barplot(data=team_wins, x='Wins', y='Team', ax=ax)
-    ax.set_title("Team Wins in IPL")
-    ax.set_xlabel("Number of Wins")
-    ax.set_ylabel("Team")
-    st.pyplot(fig)
-
-def season_performance(df_matches):
+    def draw_fig():
+        fig, ax = plt.subplots()
+        sns.barplot(data=team_wins, x='Wins', y='Team', ax=ax)
+        ax.set_title("Team Wins in IPL")
+        ax.set_xlabel("Number of Wins")
+        ax.set_ylabel("Team")
+        return fig
+    show_chart("most_successful_team.fig", (seasons,), draw_fig, charts.depends_on(seasons=seasons))
+
+def season_performance(df_matches, rolling_form):
     st.header("Team Performance by Season")
-    teams = sorted(list(set(df_matches['team1'].unique()) | set(df_matches['team2'].unique())))
+    teams = compute(analytics.season_teams, df_matches)
     selected_team = st.selectbox("Select a Team", teams)
 
-    team_seasons = df_matches[((df_matches['team1'] == selected_team) | (df_matches['team2'] == selected_team))]
-    team_season_wins = team_seasons.groupby('season')['winner'].apply(lambda x: (x == selected_team).sum()).reset_index(name='wins')
+    team_season_wins = compute(analytics.season_performance, df_matches, selected_team)['team_season_wins']
 
     st.subheader(f"{selected_team}'s Performance Over the Seasons")
     st.write(team_season_wins)
 
-    fig, ax = plt.subplots()
-    sns.lineplot(data=team_season_wins, x='season', y='wins', marker='o', ax=ax)
-    ax.set_title(f"{selected_team}'s Wins per Season")
-    ax.set_xlabel("Season")
-    ax.set_ylabel("Wins")
-    plt.xticks(rotation=45)
-    st.pyplot(fig)
-
-def head_to_head_comparison(df_matches):
+    def draw_fig():
+        fig, ax = plt.subplots()
+        sns.lineplot(data=team_season_wins, x='season', y='wins', marker='o', ax=ax)
+        ax.set_title(f"{selected_team}'s Wins per Season")
+        ax.set_xlabel("Season")
+        ax.set_ylabel("Wins")
+        ax.tick_params(axis='x', rotation=45)
+        return fig
+    depends = charts.depends_on(teams=[selected_team])
+    show_chart("season_performance.fig", (selected_team,), draw_fig, depends)
+
+    # Win % through each season, to date or over the last N matches
+    st.subheader("Win % Through Each Season")
+    window = st.slider("Matches in the rolling window (0 for season to date)", min_value=0, max_value=14, value=0)
+    form = compute(analytics.team_form, rolling_form, selected_team, window or None)['form']
+    def draw_fig_form():
+        fig_form, ax_form = plt.subplots(figsize=(12, 6))
+        sns.lineplot(data=form, x='match_number', y='form_win_pct', hue='season', palette='viridis', ax=ax_form)
+        ax_form.set_title(f"{selected_team}'s {'Rolling' if window else 'Season-to-Date'} Win %")
+        ax_form.set_xlabel("Match of Season")
+        ax_form.set_ylabel("Win %")
+        return fig_form
+    show_chart("season_performance.fig_form", (selected_team, window), draw_fig_form, depends)
+
+def head_to_head_comparison(backend):
     st.header("Head-to-Head Team Comparison")
-    teams = sorted(df_matches['team1'].unique())
+    teams = backend.played_teams()
     team1 = st.selectbox("Select Team 1", teams)
     team2 = st.selectbox("Select Team 2", [t for t in teams if t != team1])
 
     if team1 and team2:
-        df_team1_vs_team2 = df_matches[((df_matches['team1'] == team1) & (df_matches['team2'] == team2)) | ((df_matches['team1'] == team2) & (df_matches['team2'] == team1))]
-        total_matches = df_team1_vs_team2.shape[0]
-        wins_team1 = df_team1_vs_team2[df_team1_vs_team2['winner'] == team1].shape[0]
-        wins_team2 = df_team1_vs_team2[df_team1_vs_team2['winner'] == team2].shape[0]
-        ties = df_team1_vs_team2[df_team1_vs_team2['result'] == 'tie'].shape[0]
-        no_result = df_team1_vs_team2[df_team1_vs_team2['result'] == 'no result'].shape[0]
+        result = compute(backend.head_to_head_comparison, team1, team2)
+        record = result['record']
+        wins_team1 = record['wins_a']
+        wins_team2 = record['wins_b']
+        ties = record['ties']
+        no_result = record['no_results']
 
         st.subheader(f"Head-to-Head Record: {team1} vs {team2}")
-        st.write(f"Total Matches Played: {total_matches}")
+        st.write(f"Total Matches Played: {record['matches']}")
         st.write(f"Wins for {team1}: {wins_team1}")
         st.write(f"Wins for {team2}: {wins_team2}")
         st.write(f"Ties: {ties}")
@@ -341,195 +501,273 @@ def head_to_head_comparison(df_matches):
         labels = [team1, team2, 'Tie', 'No Result']
         sizes = [wins_team1, wins_team2, ties, no_result]
         colors = ['skyblue', 'lightcoral', 'lightgreen', 'lightgray']
-        fig, ax = plt.subplots()
-        ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
-        ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
-        st.pyplot(fig)
+        def draw_fig():
+            fig, ax = plt.subplots()
+            ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
+            ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
+            return fig
+        depends = charts.depends_on(teams=[team1, team2])
+        show_chart("head_to_head_comparison.fig", (team1, team2), draw_fig, depends)
 
         st.subheader("Match Results Over Seasons")
-        df_h2h_with_season = df_team1_vs_team2.groupby('season')['winner'].value_counts().unstack(fill_value=0)
+        df_h2h_with_season = result['by_season']
         st.write(df_h2h_with_season)
-        fig_seasonal, ax_seasonal = plt.subplots(figsize=(10, 6))
-        df_h2h_with_season[[team1, team2]].plot(kind='bar', stacked=False, ax=ax_seasonal)
-        ax_seasonal.set_title(f"Match Results Between {team1} and {team2} Over Seasons")
-        ax_seasonal.set_xlabel("Season")
-        ax_seasonal.set_ylabel("Number of Wins")
-        plt.xticks(rotation=45)
-        plt.legend(title='Winner')
-        st.pyplot(fig_seasonal)
-
-def get_phase(over):
-    if 0 <= over <= 5:
-        return "Powerplay (0-6)"
-    elif 6 < over <= 15:
-        return "Middle Overs (7-15)"
-    elif 15 < over <= 20:
-        return "Death Overs (16-20)"
-    return None
-
-def phase_wise_analysis(df_deliveries, df_matches):
+        def draw_fig_seasonal():
+            fig_seasonal, ax_seasonal = plt.subplots(figsize=(10, 6))
+            df_h2h_with_season[[team1, team2]].plot(kind='bar', stacked=False, ax=ax_seasonal)
+            ax_seasonal.set_title(f"Match Results Between {team1} and {team2} Over Seasons")
+            ax_seasonal.set_xlabel("Season")
+            ax_seasonal.set_ylabel("Number of Wins")
+            ax_seasonal.tick_params(axis='x', rotation=45)
+            ax_seasonal.legend(title='Winner')
+            return fig_seasonal
+        show_chart("head_to_head_comparison.fig_seasonal", (team1, team2), draw_fig_seasonal, depends)
+
+    st.subheader("All Head-to-Heads")
+    all_h2h = compute(backend.all_head_to_heads)
+    all_wins = all_h2h['wins']
+    all_matches = all_h2h['matches']
+    st.write("Wins by each team (rows) against each opponent (columns):")
+    st.write(all_wins)
+    # Pairs that never met are blank rather than 0 wins
+    show_heatmap("head_to_head_comparison.fig_all", (), all_wins.where(all_matches > 0),
+                 "Head-to-Head Wins (row team vs column opponent)", "Opponent", "Team", 'YlGnBu', (12, 10),
+                 "teams", bound_columns=True)
+
+def phase_wise_analysis(phase_stats_cube):
     st.header("Phase-wise Analysis (Powerplay, Middle, Death)")
 
-    df_deliveries['phase'] = df_deliveries['over'].apply(get_phase)
-    df_deliveries_filtered = df_deliveries.dropna(subset=['phase'])
-
-    match_ids = sorted(df_deliveries_filtered['match_id'].unique())
+    match_ids = compute(analytics.phase_match_ids, phase_stats_cube)
     selected_match_id = st.selectbox("Select a Match ID", match_ids)
 
-    df_match = df_deliveries_filtered[df_deliveries_filtered['match_id'] == selected_match_id].copy()
+    teams_in_match = compute(analytics.phase_teams, phase_stats_cube, selected_match_id)
 
-    if df_match.empty:
+    if not teams_in_match:
         st.warning("No delivery data found for the selected match.")
         return
 
-    teams_in_match = sorted(df_match['batting_team'].unique())
     selected_team = st.selectbox("Select a Batting Team", teams_in_match)
 
-    df_team_match = df_match[df_match['batting_team'] == selected_team].copy()
+    result = compute(analytics.phase_wise_analysis, phase_stats_cube, selected_match_id, selected_team)
+    phase_stats = result['phase_stats']
 
-    if df_team_match.empty:
+    if phase_stats.empty:
         st.warning(f"No batting data found for {selected_team} in the selected match.")
         return
 
     st.subheader(f"Phase-wise Analysis for {selected_team} in Match ID: {selected_match_id}")
 
-    phase_stats = df_team_match.groupby('phase').agg(
-        total_runs=('batter_runs', 'sum'),
-        total_balls=('ball', 'count'),
-        total_wickets=('is_wicket', 'sum')
-    ).reset_index()
-
-    phase_stats['run_rate'] = (phase_stats['total_runs'] / (phase_stats['total_balls'] / 6)).round(2)
-
     st.write(phase_stats)
 
-    fig, axes = plt.subplots(1, 3, figsize=(15, 5))
+    def draw_fig():
+        fig, axes = plt.subplots(1, 3, figsize=(15, 5))
 
-    sns.barplot(data=phase_stats, x='phase', y='total_runs', ax=axes[0])
-    axes[0].set_title("Runs Scored in Each Phase")
-    axes[0].set_xlabel("Phase")
-    axes[0].set_ylabel("Total Runs")
+        sns.barplot(data=phase_stats, x='phase', y='total_runs', ax=axes[0])
+        axes[0].set_title("Runs Scored in Each Phase")
+        axes[0].set_xlabel("Phase")
+        axes[0].set_ylabel("Total Runs")
 
-    sns.barplot(data=phase_stats, x='phase', y='run_rate', ax=axes[1])
-    axes[1].set_title("Average Run Rate in Each Phase")
-    axes[1].set_xlabel("Phase")
-    axes[1].set_ylabel("Run Rate")
+        sns.barplot(data=phase_stats, x='phase', y='run_rate', ax=axes[1])
+        axes[1].set_title("Average Run Rate in Each Phase")
+        axes[1].set_xlabel("Phase")
+        axes[1].set_ylabel("Run Rate")
 
-    sns.barplot(data=phase_stats, x='phase', y='total_wickets', ax=axes[2])
-    axes[2].set_title("Wickets Lost in Each Phase")
-    axes[2].set_xlabel("Phase")
-    axes[2].set_ylabel("Total Wickets")
+        sns.barplot(data=phase_stats, x='phase', y='total_wickets', ax=axes[2])
+        axes[2].set_title("Wickets Lost in Each Phase")
+        axes[2].set_xlabel("Phase")
+        axes[2].set_ylabel("Total Wickets")
 
-    st.pyplot(fig)
+        return fig
+    show_chart("phase_wise_analysis.fig", (selected_match_id, selected_team), draw_fig,
+               charts.depends_on(match_ids=[selected_match_id]))
 
     st.subheader("Match-wise Phase Analysis (All Teams)")
-    all_match_phase_stats = df_deliveries_filtered.groupby(['match_id', 'batting_team', 'phase']).agg(
-        total_runs=('batter_runs', 'sum'),
-        total_balls=('ball', 'count'),
-        total_wickets=('is_wicket', 'sum')
-    ).reset_index()
-    all_match_phase_stats['run_rate'] = (all_match_phase_stats['total_runs'] / (all_match_phase_stats['total_balls'] / 6)).round(2)
-    st.write(all_match_phase_stats[all_match_phase_stats['match_id'] == selected_match_id])
-
-def stadium_wise_performance(df_matches):
+    st.write(result['match_phase_stats'])
+
+def stadium_wise_performance(backend, seasons):
     st.header("Stadium-wise Team Performance")
 
-    venue_wins = df_matches.groupby(['venue', 'winner']).size().unstack(fill_value=0)
+    result = compute(backend.stadium_wise_performance, seasons)
+    venue_wins = result['venue_wins']
     st.subheader("Team Wins at Each Venue")
     st.write(venue_wins)
 
-    fig_heatmap, ax_heatmap = plt.subplots(figsize=(12, 10))
-    sns.heatmap(venue_wins, annot=True, cmap='YlGnBu', fmt='g', ax=ax_heatmap)
-    ax_heatmap.set_title("Team Wins at Each Venue")
-    ax_heatmap.set_xlabel("Winning Team")
-    ax_heatmap.set_ylabel("Venue")
-    st.pyplot(fig_heatmap)
+    depends = charts.depends_on(seasons=seasons)
+    show_heatmap("stadium_wise_performance.fig_heatmap", (seasons,), venue_wins,
+                 "Team Wins at Each Venue", "Winning Team", "Venue", 'YlGnBu', (12, 10), "venues", depends)
 
     st.subheader("Dominant Teams at Each Venue")
-    dominant_teams = venue_wins.idxmax(axis=1)
-    dominant_wins = venue_wins.max(axis=1)
-    dominant_df = pd.DataFrame({'Dominant Team': dominant_teams, 'Number of Wins': dominant_wins})
-    st.write(dominant_df)
-
-    fig_bar, ax_bar = plt.subplots(figsize=(12, 8))
-    dominant_teams.value_counts().plot(kind='bar', ax=ax_bar)
-    ax_bar.set_title("Number of Venues Dominated by Each Team")
-    ax_bar.set_xlabel("Team")
-    ax_bar.set_ylabel("Number of Venues")
-    st.pyplot(fig_bar)
+    st.write(result['dominant'])
+
+    def draw_fig_bar():
+        fig_bar, ax_bar = plt.subplots(figsize=(12, 8))
+        result['venues_dominated'].plot(kind='bar', ax=ax_bar)
+        ax_bar.set_title("Number of Venues Dominated by Each Team")
+        ax_bar.set_xlabel("Team")
+        ax_bar.set_ylabel("Number of Venues")
+        return fig_bar
+    show_chart("stadium_wise_performance.fig_bar", (seasons,), draw_fig_bar, depends)
 
     st.subheader("Wins per Team at Different Venues")
-    teams = sorted(df_matches['team1'].unique())
+    teams = backend.teams()
     selected_team = st.selectbox("Select a Team to See Venue-wise Performance", teams)
-    team_venue_wins = df_matches[df_matches['winner'] == selected_team]['venue'].value_counts().sort_values(ascending=False)
+    team_venue_wins = compute(backend.team_venue_wins, selected_team, seasons)
     st.write(f"Wins for {selected_team} at different venues:")
     st.write(team_venue_wins)
-    fig_team_venue, ax_team_venue = plt.subplots(figsize=(10, 6))
-    team_venue_wins.plot(kind='bar', ax=ax_team_venue)
-    ax_team_venue.set_title(f"Wins for {selected_team} at Different Venues")
-    ax_team_venue.set_xlabel("Venue")
-    ax_team_venue.set_ylabel("Number of Wins")
-    plt.xticks(rotation=45, ha='right')
-    st.pyplot(fig_team_venue)
+    def draw_fig_team_venue():
+        fig_team_venue, ax_team_venue = plt.subplots(figsize=(10, 6))
+        team_venue_wins.plot(kind='bar', ax=ax_team_venue)
+        ax_team_venue.set_title(f"Wins for {selected_team} at Different Venues")
+        ax_team_venue.set_xlabel("Venue")
+        ax_team_venue.set_ylabel("Number of Wins")
+        plt.setp(ax_team_venue.get_xticklabels(), rotation=45, ha='right')
+        return fig_team_venue
+    show_chart("stadium_wise_performance.fig_team_venue", (selected_team, seasons), draw_fig_team_venue,
+               charts.depends_on(teams=[selected_team], seasons=seasons))
 
     
 
+def season_range(all_seasons):
+    seasons = st.sidebar.select_slider(
+        "Season range (match-level views)",
+        options=all_seasons,
+        value=(all_seasons[0], all_seasons[-1]),
+    )
+    return tuple(int(season) for season in seasons)
+
+def finish(trace):
+    prewarm.first_response()
+    with st.sidebar.expander("Startup"):
+        st.json(prewarm.report())
+    with st.sidebar.expander("Chart cache"):
+        st.json(charts.chart_cache.stats())
+        st.write("Last render of each chart:")
+        st.dataframe(charts.chart_cache.render_stats(), hide_index=True)
+
+    if trace is not None:
+        performance_panel(instrumentation.finish_trace())
+
+# Navigation, in sidebar order; the prewarmer warms each view's default selections
+VIEWS = [
+    "Batter Analysis",
+    "Bowler Analysis",
+    "Batter vs Bowler Matchups",
+    "Team Wins Over Years",
+    "Match Summary",
+    "Toss Impact Analysis",
+    "Venue Impact Analysis",
+    "Seasonal Analysis",
+    "Player of the Match Analysis",
+    "Most Successful Team",
+    "Team Performance by Season",
+    "Head-to-Head Team Comparison",
+    "Phase-wise Analysis (Powerplay, Middle, Death)",
+    "Stadium-wise Team Performance",
+]
+
+# Views whose filters and aggregations a query backend can push down
+BACKEND_VIEWS = {
+    "Batter Analysis",
+    "Bowler Analysis",
+    "Head-to-Head Team Comparison",
+    "Stadium-wise Team Performance",
+}
+
 def main():
+    st.set_page_config(page_title="IPL Analysis", layout="wide")
+    # Once per process: warm the other views while this one is served
+    prewarm.start()
     st.title("IPL Data Analysis (2008–2024)")
 
-    df_deliveries, df_matches = load_data()
+    profiling = st.sidebar.checkbox("Profile this view", value=instrumentation.ENABLED or bool(instrumentation.LOG_PATH))
+    trace = instrumentation.start_trace("app") if profiling else None
+    st.session_state['interactive_heatmaps'] = st.sidebar.checkbox(
+        "Interactive heatmaps", value=charts.INTERACTIVE_HEATMAPS
+    )
+
+    st.sidebar.title("Navigation")
+    options = st.sidebar.radio("Go to", VIEWS)
+
+    try:
+        data_version = storage.data_version()
+    except FileNotFoundError:
+        data_version = None
+    st.session_state['data_version'] = data_version
+    # Charts untouched by newly appended matches survive the version bump
+    charts.chart_cache.advance(data_version, storage.appends_between)
+    if trace is not None:
+        trace.label = options
+        trace.context['data_version'] = data_version
+
+    # IPL_QUERY_BACKEND=duckdb answers the pushed-down views without loading the tables
+    backend_name = backends.configured()
+    if backend_name != 'pandas' and options in BACKEND_VIEWS and data_version is not None:
+        with instrumentation.span(f"aggregate.{backend_name}"):
+            backend = resources.get_sql_backend(backend_name, data_version)
+        with instrumentation.span(f"view.{options}"):
+            seasons = season_range(backend.seasons())
+            if options == "Batter Analysis":
+                batter_analysis(backend)
+            elif options == "Bowler Analysis":
+                bowler_analysis(backend)
+            elif options == "Head-to-Head Team Comparison":
+                head_to_head_comparison(backend)
+            elif options == "Stadium-wise Team Performance":
+                stadium_wise_performance(backend, seasons)
+        finish(trace)
+        return
+
+    with instrumentation.span("load_data") as span:
+        df_deliveries, df_matches = resources.load_data(data_version)
+        if span.active and df_deliveries is not None:
+            span.set_rows(len(df_deliveries) + len(df_matches))
     if df_deliveries is None or df_matches is None:
+        instrumentation.finish_trace()
         return
+    dataset = resources.get_dataset(df_deliveries, df_matches, data_version)
+    backend = backends.PandasBackend(dataset)
+    # Views must not mutate the shared tables; shallow copies make any write
+    # copy the touched column for this session only
+    df_deliveries, df_matches = df_deliveries.copy(deep=False), df_matches.copy(deep=False)
+
+    match_cube = aggregate(dataset, "match_cube")
+    seasons = season_range(match_cube.seasons())
+
+    with instrumentation.span(f"view.{options}"):
+        if options == "Batter Analysis":
+            aggregate(dataset, "player_index")
+            batter_analysis(backend, aggregate(dataset, "rolling_form"))
+        elif options == "Bowler Analysis":
+            aggregate(dataset, "player_index")
+            bowler_analysis(backend, aggregate(dataset, "rolling_form"))
+        elif options == "Batter vs Bowler Matchups":
+            matchup_analysis(aggregate(dataset, "matchups"))
+        elif options == "Team Wins Over Years":
+            team_wins_over_years(match_cube, seasons)
+        elif options == "Match Summary":
+            match_summary(aggregate(dataset, "match_index"))
+        elif options == "Toss Impact Analysis":
+            toss_impact_analysis(match_cube, seasons)
+        elif options == "Venue Impact Analysis":
+            venue_impact_analysis(match_cube, seasons)
+        elif options == "Seasonal Analysis":
+            seasonal_analysis(match_cube, seasons)
+        elif options == "Player of the Match Analysis":
+            player_of_match_analysis(df_matches)
+        elif options == "Most Successful Team":
+            most_successful_team(match_cube, seasons)
+        elif options == "Most Successful Team":
+            most_successful_team(match_cube, seasons)
+        elif options == "Team Performance by Season":
+            season_performance(df_matches, aggregate(dataset, "rolling_form"))
+        elif options == "Head-to-Head Team Comparison":
+            aggregate(dataset, "head_to_head")
+            head_to_head_comparison(backend)
+        elif options == "Phase-wise Analysis (Powerplay, Middle, Death)":
+            phase_wise_analysis(aggregate(dataset, "phase_cube"))
+        elif options == "Stadium-wise Team Performance":
+            stadium_wise_performance(backend, seasons)
+    finish(trace)
 
-    st.sidebar.title("Navigation")
-    options = st.sidebar.radio(
-        "Go to",
-        [
-            "Batter Analysis",
-            "Bowler Analysis",
-            "Team Wins Over Years",
-            "Match Summary",
-            "Toss Impact Analysis",
-            "Venue Impact Analysis",
-            "Seasonal Analysis",
-            "Player of the Match Analysis",
-            "Most Successful Team",
-            "Team Performance by Season",
-            "Head-to-Head Team Comparison",
-            "Phase-wise Analysis (Powerplay, Middle, Death)",
-            "Stadium-wise Team Performance"
-        ],
-    )
-    if options == "Batter Analysis":
-        batter_analysis(df_deliveries, df_matches)
-    elif options == "Bowler Analysis":
-        bowler_analysis(df_deliveries,df_matches)
-    elif options == "Team Wins Over Years":
-        team_wins_over_years(df_matches)
-    elif options == "Match Summary":
-        match_summary(df_matches)
-    elif options == "Toss Impact Analysis":
-        toss_impact_analysis(df_matches)
-    elif options == "Venue Impact Analysis":
-        venue_impact_analysis(df_matches)
-    elif options == "Seasonal Analysis":
-        seasonal_analysis(df_matches)
-    elif options == "Player of the Match Analysis":
-        player_of_match_analysis(df_matches)
-    elif options == "Most Successful Team":
-        most_successful_team(df_matches)
-    elif options == "Most Successful Team":
-        most_successful_team(df_matches)
-    elif options == "Team Performance by Season":
-        season_performance(df_matches)
-    elif options == "Head-to-Head Team Comparison":
-        head_to_head_comparison(df_matches)
-    elif options == "Phase-wise Analysis (Powerplay, Middle, Death)":
-        phase_wise_analysis(df_deliveries, df_matches)
-    elif options == "Stadium-wise Team Performance":
-        stadium_wise_performance(df_matches)
 if __name__ == "__main__":
     main()
-        
-
-
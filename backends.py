@@ -0,0 +1,273 @@
+"""Query backends for the views whose filters and aggregations can be pushed down."""
+import os
+import threading
+import warnings
+
+import pandas as pd
+
+import aggregates
+import analytics
+import storage
+
+# IPL_QUERY_BACKEND selects where the pushed-down views run
+BACKENDS = ('pandas', 'duckdb')
+DEFAULT_BACKEND = os.environ.get("IPL_QUERY_BACKEND", "pandas").lower()
+
+
+def _duckdb_available():
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def configured(name=None):
+    name = (name or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown query backend {name!r}; expected one of {', '.join(BACKENDS)}")
+    if name == 'duckdb' and not _duckdb_available():
+        warnings.warn("duckdb is not installed; falling back to the pandas backend")
+        return 'pandas'
+    return name
+
+
+class PandasBackend:
+    """Answers the pushed-down views from the in-memory aggregates of a dataset."""
+
+    name = 'pandas'
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def seasons(self):
+        return self.dataset.match_cube.seasons()
+
+    def teams(self):
+        return self.dataset.match_cube.teams()
+
+    def batters(self):
+        return self.dataset.player_index.batters()
+
+    def bowlers(self):
+        return self.dataset.player_index.bowlers()
+
+    def played_teams(self):
+        return self.dataset.head_to_head.played_teams()
+
+    def batter_analysis(self, batter):
+        return analytics.batter_analysis(self.dataset.player_index, batter)
+
+    def bowler_analysis(self, bowler):
+        return analytics.bowler_analysis(self.dataset.player_index, bowler)
+
+    def head_to_head_comparison(self, team1, team2):
+        return analytics.head_to_head_comparison(self.dataset.head_to_head, team1, team2)
+
+    def all_head_to_heads(self):
+        return analytics.all_head_to_heads(self.dataset.head_to_head)
+
+    def stadium_wise_performance(self, seasons=None):
+        return analytics.stadium_wise_performance(self.dataset.match_cube, seasons)
+
+    def team_venue_wins(self, team, seasons=None):
+        return analytics.team_venue_wins(self.dataset.match_cube, team, seasons)
+
+
+# Deliveries with the match context enrich_deliveries adds, computed in the query
+ENRICHED_SQL = """
+CREATE VIEW enriched AS
+SELECT d.*,
+       m.season,
+       m.venue,
+       CASE WHEN d.batting_team = m.team1 THEN m.team2 ELSE m.team1 END AS opponent,
+       CASE WHEN m.winner IS NULL THEN 'No Result' WHEN m.winner = d.batting_team THEN 'Won' ELSE 'Lost' END
+           AS batting_result,
+       CASE WHEN m.winner IS NULL THEN 'No Result' WHEN m.winner = d.bowling_team THEN 'Won' ELSE 'Lost' END
+           AS bowling_result
+FROM deliveries d LEFT JOIN matches m ON d.match_id = m.id
+"""
+
+
+def _sql_list(paths):
+    return '[' + ', '.join("'" + path.replace("'", "''") + "'" for path in paths) + ']'
+
+
+def _season_filter(seasons):
+    if seasons is None:
+        return '', []
+    return ' AND season BETWEEN ? AND ?', [int(seasons[0]), int(seasons[1])]
+
+
+def _series(df, key, value, name=None):
+    return pd.Series(df[value].to_numpy(), index=pd.Index(df[key], name=key), name=name or value)
+
+
+class DuckDBBackend:
+    """Runs the pushed-down views as SQL over the columnar files in place.
+
+    Only each query's result is materialized in pandas; the tables themselves
+    are scanned by DuckDB from the parquet copies (and appended parts), so
+    they never have to fit in memory. Results match PandasBackend's.
+    """
+
+    name = 'duckdb'
+
+    def __init__(self, sources, database=':memory:'):
+        import duckdb
+        self._con = duckdb.connect(database)
+        self._lock = threading.Lock()
+        for table, paths in sources.items():
+            self._con.execute(
+                f"CREATE VIEW {table} AS SELECT * FROM read_parquet({_sql_list(paths)}, union_by_name = true)"
+            )
+        self._con.execute(ENRICHED_SQL)
+
+    @classmethod
+    def from_storage(cls, deliveries_path=storage.DELIVERIES_CSV, matches_path=storage.MATCHES_CSV,
+                     cache_dir=storage.CACHE_DIR):
+        return cls(storage.columnar_sources(deliveries_path, matches_path, cache_dir))
+
+    def _query(self, sql, params=()):
+        # One cursor per query: the connection is shared by every session
+        with self._lock:
+            cursor = self._con.cursor()
+        return cursor.execute(sql, list(params)).df()
+
+    def _column(self, sql, params=()):
+        return self._query(sql, params).iloc[:, 0].tolist()
+
+    def seasons(self):
+        return self._column("SELECT DISTINCT season FROM matches WHERE season IS NOT NULL ORDER BY 1")
+
+    def teams(self):
+        return self._column(
+            "SELECT toss_winner FROM matches WHERE toss_winner IS NOT NULL "
+            "UNION SELECT winner FROM matches WHERE winner IS NOT NULL ORDER BY 1"
+        )
+
+    def batters(self):
+        return self._column("SELECT DISTINCT batter FROM deliveries WHERE batter IS NOT NULL ORDER BY 1")
+
+    def bowlers(self):
+        return self._column("SELECT DISTINCT bowler FROM deliveries WHERE bowler IS NOT NULL ORDER BY 1")
+
+    def played_teams(self):
+        return self._column(
+            "SELECT team1 FROM matches WHERE team1 IS NOT NULL AND team2 IS NOT NULL "
+            "UNION SELECT team2 FROM matches WHERE team1 IS NOT NULL AND team2 IS NOT NULL ORDER BY 1"
+        )
+
+    def _histogram(self, player_column, runs_column, name):
+        hist = self._query(
+            f"SELECT {runs_column}, count(*) AS n FROM deliveries WHERE {player_column} = ? GROUP BY 1 ORDER BY 1",
+            [name],
+        )
+        return _series(hist, runs_column, 'n', name)
+
+    def _grouped(self, value_sql, value, key, player_column, name, where=''):
+        # Ordered by key first so sort_values breaks ties like the pandas path
+        df = self._query(
+            f"SELECT {key}, {value_sql} AS {value} FROM enriched "
+            f"WHERE {player_column} = ? AND {key} IS NOT NULL{where} GROUP BY 1 ORDER BY 1",
+            [name],
+        )
+        return _series(df, key, value)
+
+    def batter_analysis(self, batter):
+        totals = self._query(
+            "SELECT sum(batter_runs)::BIGINT AS total_runs, count(*) AS total_balls, "
+            "count(*) FILTER (WHERE batter_runs = 4) AS total_fours, "
+            "count(*) FILTER (WHERE batter_runs = 6) AS total_sixes "
+            "FROM deliveries WHERE batter = ?",
+            [batter],
+        )
+        totals.index = pd.Index([batter], name='batter')
+        return {
+            'metrics': aggregates.finish_batting(totals).loc[batter],
+            'runs_distribution': self._histogram('batter', 'batter_runs', batter),
+            'runs_vs_opponent': (
+                self._grouped('sum(batter_runs)::BIGINT', 'batter_runs', 'opponent', 'batter', batter)
+                .sort_values(ascending=False, kind='stable')
+            ),
+            'runs_by_result': self._grouped('sum(batter_runs)::BIGINT', 'batter_runs', 'batting_result', 'batter', batter),
+        }
+
+    def bowler_analysis(self, bowler):
+        totals = self._query(
+            "SELECT count(*) AS total_balls, sum(total_runs)::BIGINT AS runs_conceded, "
+            "count(dismissal_kind) AS total_wickets FROM deliveries WHERE bowler = ?",
+            [bowler],
+        )
+        totals.index = pd.Index([bowler], name='bowler')
+        return {
+            'metrics': aggregates.finish_bowling(totals).loc[bowler],
+            'runs_distribution': self._histogram('bowler', 'total_runs', bowler),
+            'wickets_vs_opponent': (
+                self._grouped('count(dismissal_kind)', 'dismissal_kind', 'batting_team', 'bowler', bowler,
+                              ' AND dismissal_kind IS NOT NULL')
+                .sort_values(ascending=False, kind='stable')
+            ),
+            'wickets_by_result': self._grouped('count(dismissal_kind)', 'dismissal_kind', 'bowling_result', 'bowler', bowler),
+        }
+
+    def head_to_head_comparison(self, team1, team2):
+        pair = "((team1 = $1 AND team2 = $2) OR (team1 = $2 AND team2 = $1))"
+        record = self._query(
+            "SELECT count(*) AS matches, count(*) FILTER (WHERE winner = $1) AS wins_a, "
+            "count(*) FILTER (WHERE winner = $2) AS wins_b, count(*) FILTER (WHERE result = 'tie') AS ties, "
+            f"count(*) FILTER (WHERE result = 'no result') AS no_results FROM matches WHERE {pair}",
+            [team1, team2],
+        ).iloc[0]
+        by_season = self._query(
+            "SELECT season, count(*) FILTER (WHERE winner = $1) AS wins_a, "
+            f"count(*) FILTER (WHERE winner = $2) AS wins_b FROM matches WHERE {pair} GROUP BY 1 ORDER BY 1",
+            [team1, team2],
+        )
+        return {
+            'record': {key: int(value) for key, value in record.items()},
+            'by_season': pd.DataFrame(
+                {team1: by_season['wins_a'].to_numpy(), team2: by_season['wins_b'].to_numpy()},
+                index=pd.Index(by_season['season'], name='season'),
+            ),
+        }
+
+    def all_head_to_heads(self):
+        pairs = self._query(
+            "WITH sides AS ("
+            " SELECT team1 AS team, team2 AS opponent, winner FROM matches"
+            " WHERE team1 IS NOT NULL AND team2 IS NOT NULL"
+            " UNION ALL SELECT team2, team1, winner FROM matches"
+            " WHERE team1 IS NOT NULL AND team2 IS NOT NULL) "
+            "SELECT team, opponent, count(*) AS matches, count(*) FILTER (WHERE winner = team) AS wins "
+            "FROM sides GROUP BY 1, 2"
+        )
+        teams = pd.Index(sorted(set(pairs['team'])))
+        result = {}
+        for field in ('wins', 'matches'):
+            matrix = pairs.pivot(index='team', columns='opponent', values=field)
+            matrix = matrix.reindex(index=teams, columns=teams, fill_value=0).fillna(0).astype('int64')
+            matrix.index.name, matrix.columns.name = 'team', 'opponent'
+            result[field] = matrix
+        return result
+
+    def stadium_wise_performance(self, seasons=None):
+        where, params = _season_filter(seasons)
+        cells = self._query(
+            "SELECT venue, winner, count(*) AS count FROM matches "
+            f"WHERE venue IS NOT NULL AND winner IS NOT NULL{where} GROUP BY 1, 2",
+            params,
+        )
+        # Categorical like the encoded tables, so tied counts rank the same way
+        cells = cells.astype({'venue': 'category', 'winner': 'category'})
+        venue_wins = cells.groupby(['venue', 'winner'], observed=True)['count'].sum().unstack(fill_value=0)
+        return {'venue_wins': venue_wins, **analytics.venue_dominance(venue_wins)}
+
+    def team_venue_wins(self, team, seasons=None):
+        where, params = _season_filter(seasons)
+        wins = self._query(
+            "SELECT venue, count(*) AS count FROM matches "
+            f"WHERE winner = ? AND venue IS NOT NULL{where} GROUP BY 1 ORDER BY 1",
+            [team] + params,
+        )
+        return _series(wins, 'venue', 'count').sort_values(ascending=False, kind='stable')
@@ -0,0 +1,150 @@
+"""Precompute every dashboard view for every selection and write it to disk.
+
+    python batch_report.py --out reports --workers 8
+
+Each worker process loads the dataset once (from the columnar cache) and
+then evaluates a share of the (view, selection) tasks.
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import storage
+
+_dataset = None
+
+
+def _init_worker(deliveries_path, matches_path, cache_dir):
+    global _dataset
+    _dataset = analytics.load_dataset(deliveries_path, matches_path, cache_dir)
+
+
+def slug(value):
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', str(value)).strip('_') or '_'
+
+
+def enumerate_tasks(dataset):
+    """All (view, params) pairs the dashboard can show."""
+    seasons = [int(s) for s in dataset.match_cube.seasons()]
+    season_ranges = [None] + [(s, s) for s in seasons]
+    teams = analytics.season_teams(dataset.matches)
+    tasks = []
+    tasks += [('batter_analysis', (name,)) for name in dataset.player_index.batters()]
+    tasks += [('bowler_analysis', (name,)) for name in dataset.player_index.bowlers()]
+    tasks += [('matchup_analysis', (name,)) for name in dataset.matchups.batters()]
+    tasks += [('batter_form', (name,)) for name in dataset.player_index.batters()]
+    tasks += [('bowler_form', (name,)) for name in dataset.player_index.bowlers()]
+    tasks += [('match_summary', (int(match_id),)) for match_id in dataset.match_index.matches.index]
+    for match_id in analytics.phase_match_ids(dataset.phase_cube):
+        for team in analytics.phase_teams(dataset.phase_cube, match_id):
+            tasks.append(('phase_wise_analysis', (int(match_id), team)))
+    for view in ('team_wins_over_years', 'toss_impact_analysis', 'venue_impact_analysis',
+                 'seasonal_analysis', 'most_successful_team', 'stadium_wise_performance'):
+        tasks += [(view, (seasons_range,)) for seasons_range in season_ranges]
+    tasks += [('team_venue_wins', (team, None)) for team in teams]
+    tasks += [('season_performance', (team,)) for team in teams]
+    tasks += [('team_form', (team,)) for team in teams]
+    played = dataset.head_to_head.played_teams()
+    tasks += [('head_to_head_comparison', pair) for pair in itertools.permutations(played, 2)]
+    tasks.append(('all_head_to_heads', ()))
+    tasks.append(('player_of_match_analysis', ()))
+    return tasks
+
+
+def compute(dataset, view, params):
+    sources = {
+        'batter_analysis': dataset.player_index,
+        'bowler_analysis': dataset.player_index,
+        'matchup_analysis': dataset.matchups,
+        'batter_form': dataset.rolling_form,
+        'bowler_form': dataset.rolling_form,
+        'team_form': dataset.rolling_form,
+        'match_summary': dataset.match_index,
+        'phase_wise_analysis': dataset.phase_cube,
+        'head_to_head_comparison': dataset.head_to_head,
+        'all_head_to_heads': dataset.head_to_head,
+        'season_performance': dataset.matches,
+        'player_of_match_analysis': dataset.matches,
+    }
+    source = sources.get(view, dataset.match_cube)
+    result = getattr(analytics, view)(source, *params)
+    if not isinstance(result, dict):
+        result = {view: result}
+    return result
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def write_result(out_dir, view, params, result):
+    key = '__'.join(slug(p if p is not None else 'all') for p in params) or 'all'
+    target = os.path.join(out_dir, view, key)
+    os.makedirs(target, exist_ok=True)
+    scalars = {}
+    for name, value in result.items():
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            value.to_csv(os.path.join(target, f"{name}.csv"))
+        else:
+            scalars[name] = _to_json(value)
+    if scalars:
+        with open(os.path.join(target, 'values.json'), 'w') as fh:
+            json.dump(scalars, fh, indent=2, default=str)
+
+
+def _run_batch(batch, out_dir):
+    written = 0
+    for view, params in batch:
+        write_result(out_dir, view, params, compute(_dataset, view, params))
+        written += 1
+    return written
+
+
+def _batches(tasks, size):
+    for start in range(0, len(tasks), size):
+        yield tasks[start:start + size]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute every dashboard view to disk.")
+    parser.add_argument("--out", default="reports")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--deliveries", default=storage.DELIVERIES_CSV)
+    parser.add_argument("--matches", default=storage.MATCHES_CSV)
+    parser.add_argument("--cache-dir", default=storage.CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    # Loading once here also warms the columnar cache the workers read from
+    dataset = analytics.load_dataset(args.deliveries, args.matches, args.cache_dir)
+    tasks = enumerate_tasks(dataset)
+    os.makedirs(args.out, exist_ok=True)
+
+    init_args = (args.deliveries, args.matches, args.cache_dir)
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=init_args) as pool:
+        written = sum(pool.map(_run_batch, _batches(tasks, args.batch_size), itertools.repeat(args.out)))
+
+    manifest = {
+        'data_version': dataset.data_version,
+        'tasks': written,
+        'workers': args.workers,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    with open(os.path.join(args.out, 'manifest.json'), 'w') as fh:
+        json.dump(manifest, fh, indent=2)
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""Benchmark every view on synthetic data at several multiples of the IPL size.
+
+    python benchmark.py --scales 1,10,100 --out bench_results.jsonl
+
+Results are appended as JSON lines (one per scale x stage) tagged with the
+current git commit, so runs from different commits can be compared.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import analytics
+import backends
+import headless
+import storage
+
+# Shape of one IPL-sized league; scale N generates N such leagues
+TEAMS_PER_LEAGUE = 10
+SQUAD_SIZE = 25
+VENUES_PER_LEAGUE = 36
+SEASONS = list(range(2008, 2025))
+MATCHES_PER_SEASON = 64
+UMPIRES_PER_LEAGUE = 60
+
+RUN_VALUES = np.array([0, 1, 2, 3, 4, 6])
+RUN_WEIGHTS = np.array([0.38, 0.37, 0.07, 0.005, 0.125, 0.05])
+DISMISSALS = np.array(['caught', 'bowled', 'lbw', 'run out', 'stumped', 'caught and bowled'])
+
+
+def synthetic_tables(scale=1, seed=0):
+    """Matches and deliveries tables shaped like the IPL data, `scale` leagues wide.
+
+    Team, player and venue counts grow with `scale`; every delivery's
+    match_id refers to a generated match. Both frames come back with the
+    same typed schema and shared dictionaries as storage.load_tables.
+    """
+    rng = np.random.default_rng(seed)
+    n_leagues = int(scale)
+    n_matches = n_leagues * len(SEASONS) * MATCHES_PER_SEASON
+
+    teams = np.array([f"League {l} Team {t}" for l in range(n_leagues) for t in range(TEAMS_PER_LEAGUE)])
+    players = np.array([f"L{l}T{t} Player {p}" for l in range(n_leagues)
+                        for t in range(TEAMS_PER_LEAGUE) for p in range(SQUAD_SIZE)])
+    venues = np.array([f"League {l} Ground {v}" for l in range(n_leagues) for v in range(VENUES_PER_LEAGUE)])
+    umpires = np.array([f"L{l} Umpire {u}" for l in range(n_leagues) for u in range(UMPIRES_PER_LEAGUE)])
+
+    league = np.repeat(np.arange(n_leagues), len(SEASONS) * MATCHES_PER_SEASON)
+    season = np.tile(np.repeat(SEASONS, MATCHES_PER_SEASON), n_leagues)
+    home = rng.integers(0, TEAMS_PER_LEAGUE, n_matches)
+    away = (home + rng.integers(1, TEAMS_PER_LEAGUE, n_matches)) % TEAMS_PER_LEAGUE
+    team1 = league * TEAMS_PER_LEAGUE + home
+    team2 = league * TEAMS_PER_LEAGUE + away
+    toss_winner = np.where(rng.random(n_matches) < 0.5, team1, team2)
+    winner = np.where(rng.random(n_matches) < 0.5, team1, team2)
+    outcome = rng.random(n_matches)
+    result = np.select([outcome < 0.005, outcome < 0.018, outcome < 0.55], ['no result', 'tie', 'wickets'], 'runs')
+    no_result = result == 'no result'
+    pom_team = np.where(rng.random(n_matches) < 0.65, winner, toss_winner)
+    ids = np.arange(n_matches) + 100000
+
+    df_matches = pd.DataFrame({
+        'id': ids,
+        'season': season,
+        'city': pd.Categorical.from_codes(league * VENUES_PER_LEAGUE + rng.integers(0, VENUES_PER_LEAGUE, n_matches), venues),
+        'date': (pd.to_datetime(season.astype(str) + '-04-01') + pd.to_timedelta(np.arange(n_matches) % MATCHES_PER_SEASON, unit='D')).strftime('%Y-%m-%d'),
+        'match_type': 'League',
+        'player_of_match': pd.Categorical.from_codes(pom_team * SQUAD_SIZE + rng.integers(0, 11, n_matches), players),
+        'venue': pd.Categorical.from_codes(league * VENUES_PER_LEAGUE + rng.integers(0, VENUES_PER_LEAGUE, n_matches), venues),
+        'team1': pd.Categorical.from_codes(team1, teams),
+        'team2': pd.Categorical.from_codes(team2, teams),
+        'toss_winner': pd.Categorical.from_codes(toss_winner, teams),
+        'toss_decision': np.where(rng.random(n_matches) < 0.6, 'field', 'bat'),
+        'winner': pd.Categorical.from_codes(np.where(no_result, -1, winner), teams),
+        'result': result,
+        'result_margin': rng.integers(1, 80, n_matches).astype('float32'),
+        'umpire1': pd.Categorical.from_codes(league * UMPIRES_PER_LEAGUE + rng.integers(0, UMPIRES_PER_LEAGUE, n_matches), umpires),
+        'umpire2': pd.Categorical.from_codes(league * UMPIRES_PER_LEAGUE + rng.integers(0, UMPIRES_PER_LEAGUE, n_matches), umpires),
+    })
+
+    # 2 innings x 20 overs x 6 legal balls per match
+    balls_per_match = 2 * 20 * 6
+    n_balls = n_matches * balls_per_match
+    match_pos = np.repeat(np.arange(n_matches), balls_per_match)
+    within = np.tile(np.arange(balls_per_match), n_matches)
+    inning = within // 120 + 1
+    over = (within % 120) // 6
+    ball = within % 6 + 1
+    batting = np.where(inning == 1, team1[match_pos], team2[match_pos])
+    bowling = np.where(inning == 1, team2[match_pos], team1[match_pos])
+    batter_runs = rng.choice(RUN_VALUES, n_balls, p=RUN_WEIGHTS).astype('int16')
+    extra_runs = (rng.random(n_balls) < 0.06).astype('int16')
+    is_wicket = (rng.random(n_balls) < 0.05).astype('int8')
+    # Bowlers change every over and come from the fielding side's last six players
+    over_bowler = rng.integers(SQUAD_SIZE - 6, SQUAD_SIZE, n_matches * 40)
+    bowler = bowling * SQUAD_SIZE + np.repeat(over_bowler, 6)
+    batter = batting * SQUAD_SIZE + np.minimum(np.cumsum(is_wicket) % 11, 10)
+    dismissal = np.where(is_wicket == 1, rng.integers(0, len(DISMISSALS), n_balls), -1)
+
+    df_deliveries = pd.DataFrame({
+        'match_id': ids[match_pos],
+        'inning': inning.astype('int8'),
+        'batting_team': pd.Categorical.from_codes(batting, teams),
+        'bowling_team': pd.Categorical.from_codes(bowling, teams),
+        'over': over.astype('int8'),
+        'ball': ball.astype('int8'),
+        'batter': pd.Categorical.from_codes(batter, players),
+        'bowler': pd.Categorical.from_codes(bowler, players),
+        'batter_runs': batter_runs,
+        'extra_runs': extra_runs,
+        'total_runs': (batter_runs + extra_runs).astype('int16'),
+        'is_wicket': is_wicket,
+        'dismissal_kind': pd.Categorical.from_codes(dismissal, DISMISSALS),
+    })
+    storage.apply_schema(df_matches, storage.MATCHES_DTYPES)
+    storage.encode_entities(df_deliveries, df_matches)
+    return df_deliveries, df_matches
+
+
+def import_app_headless():
+    return headless.import_app()
+
+
+def view_cases(dataset, app=None):
+    """(name, input rows, callable) for each view's computation or full render."""
+    deliveries_rows = len(dataset.deliveries)
+    matches_rows = len(dataset.matches)
+    player_index = dataset.player_index
+    seasons = None
+    batter = player_index.batters()[0]
+    bowler = player_index.bowlers()[0]
+    match_id = analytics.phase_match_ids(dataset.phase_cube)[0]
+    phase_team = analytics.phase_teams(dataset.phase_cube, match_id)[0]
+    teams = dataset.head_to_head.played_teams()
+    team1, team2 = teams[0], teams[1]
+
+    if app is None:
+        return [
+            ('batter_analysis', deliveries_rows, lambda: analytics.batter_analysis(player_index, batter)),
+            ('bowler_analysis', deliveries_rows, lambda: analytics.bowler_analysis(player_index, bowler)),
+            ('matchup_analysis', deliveries_rows, lambda: analytics.matchup_analysis(dataset.matchups, batter, bowler)),
+            ('batter_form', deliveries_rows, lambda: analytics.batter_form(dataset.rolling_form, batter)),
+            ('bowler_form', deliveries_rows, lambda: analytics.bowler_form(dataset.rolling_form, bowler)),
+            ('team_form', matches_rows, lambda: analytics.team_form(dataset.rolling_form, teams[0])),
+            ('team_wins_over_years', matches_rows, lambda: analytics.team_wins_over_years(dataset.match_cube, seasons)),
+            ('match_summary', deliveries_rows, lambda: analytics.match_summary(dataset.match_index, match_id)),
+            ('toss_impact_analysis', matches_rows, lambda: analytics.toss_impact_analysis(dataset.match_cube, seasons)),
+            ('venue_impact_analysis', matches_rows, lambda: analytics.venue_impact_analysis(dataset.match_cube, seasons)),
+            ('seasonal_analysis', matches_rows, lambda: analytics.seasonal_analysis(dataset.match_cube, seasons)),
+            ('player_of_match_analysis', matches_rows, lambda: analytics.player_of_match_analysis(dataset.matches)),
+            ('most_successful_team', matches_rows, lambda: analytics.most_successful_team(dataset.match_cube, seasons)),
+            ('season_performance', matches_rows, lambda: analytics.season_performance(dataset.matches, teams[0])),
+            ('head_to_head_comparison', matches_rows, lambda: analytics.head_to_head_comparison(dataset.head_to_head, team1, team2)),
+            ('all_head_to_heads', matches_rows, lambda: analytics.all_head_to_heads(dataset.head_to_head)),
+            ('phase_wise_analysis', deliveries_rows, lambda: analytics.phase_wise_analysis(dataset.phase_cube, match_id, phase_team)),
+            ('stadium_wise_performance', matches_rows, lambda: analytics.stadium_wise_performance(dataset.match_cube, seasons)),
+        ]
+
+    all_seasons = tuple(int(s) for s in dataset.match_cube.seasons())
+    season_range = (all_seasons[0], all_seasons[-1])
+    backend = backends.PandasBackend(dataset)
+    return [
+        ('batter_analysis', deliveries_rows, lambda: app.batter_analysis(backend, dataset.rolling_form)),
+        ('bowler_analysis', deliveries_rows, lambda: app.bowler_analysis(backend, dataset.rolling_form)),
+        ('matchup_analysis', deliveries_rows, lambda: app.matchup_analysis(dataset.matchups)),
+        ('team_wins_over_years', matches_rows, lambda: app.team_wins_over_years(dataset.match_cube, season_range)),
+        ('match_summary', deliveries_rows, lambda: app.match_summary(dataset.match_index)),
+        ('toss_impact_analysis', matches_rows, lambda: app.toss_impact_analysis(dataset.match_cube, season_range)),
+        ('venue_impact_analysis', matches_rows, lambda: app.venue_impact_analysis(dataset.match_cube, season_range)),
+        ('seasonal_analysis', matches_rows, lambda: app.seasonal_analysis(dataset.match_cube, season_range)),
+        ('player_of_match_analysis', matches_rows, lambda: app.player_of_match_analysis(dataset.matches)),
+        ('most_successful_team', matches_rows, lambda: app.most_successful_team(dataset.match_cube, season_range)),
+        ('season_performance', matches_rows, lambda: app.season_performance(dataset.matches, dataset.rolling_form)),
+        ('head_to_head_comparison', matches_rows, lambda: app.head_to_head_comparison(backend)),
+        ('phase_wise_analysis', deliveries_rows, lambda: app.phase_wise_analysis(dataset.phase_cube)),
+        ('stadium_wise_performance', matches_rows, lambda: app.stadium_wise_performance(backend, season_range)),
+    ]
+
+
+def build_cases(df_deliveries, df_matches, holder):
+    # Load-time stages; each stores its product on `holder` for the view cases
+    def enrich():
+        holder.deliveries = aggregates.enrich_deliveries(df_deliveries, df_matches)
+
+    def build(name, factory):
+        def run():
+            setattr(holder, name, factory())
+        return run
+
+    rows = len(df_deliveries)
+    return [
+        ('build.enrich_deliveries', rows, enrich),
+        ('build.player_index', rows, build('player_index', lambda: aggregates.PlayerIndex(holder.deliveries))),
+        ('build.matchups', rows, build('matchups', lambda: aggregates.Matchups(holder.deliveries))),
+        ('build.rolling_form', rows, build('rolling_form', lambda: aggregates.RollingForm(holder.deliveries, df_matches))),
+        ('build.phase_cube', rows, build('phase_cube', lambda: aggregates.phase_cube(holder.deliveries))),
+        ('build.match_index', rows, build('match_index', lambda: aggregates.MatchIndex(holder.deliveries, df_matches))),
+        ('build.head_to_head', len(df_matches), build('head_to_head', lambda: aggregates.HeadToHead(df_matches))),
+        ('build.match_cube', len(df_matches), build('match_cube', lambda: aggregates.MatchCube(df_matches))),
+    ]
+
+
+def measure(func, repeat):
+    """Best wall time over `repeat` runs, then one traced run for peak memory."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), sum(timings) / len(timings), peak
+
+
+def uncached(chart_cache, func):
+    # Every measured run of a render case draws its charts, not just the first
+    def run():
+        chart_cache.clear()
+        return func()
+    return run
+
+
+def cold_import_app():
+    # A fresh interpreter, so time to import the app includes every dependency
+    subprocess.run(
+        [sys.executable, '-c', 'import headless; headless.import_app()'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+    )
+
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def run(scales, repeat=3, render=False, seed=0, interactive=False):
+    app = import_app_headless() if render else None
+    if app is not None:
+        app.st.session_state['interactive_heatmaps'] = interactive
+    base = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'interactive_heatmaps': interactive,
+    }
+    for scale in scales:
+        df_deliveries, df_matches = synthetic_tables(scale, seed)
+        dataset = analytics.Dataset(df_deliveries, df_matches)
+        sizes = {'scale': scale, 'deliveries_rows': len(df_deliveries), 'matches_rows': len(df_matches)}
+
+        def record(stage, name, rows, func):
+            best, mean, peak = measure(func, repeat)
+            return {
+                **base,
+                **sizes,
+                'stage': stage,
+                'view': name,
+                'rows': rows,
+                'seconds': round(best, 6),
+                'mean_seconds': round(mean, 6),
+                'peak_bytes': peak,
+                'rows_per_second': round(rows / best) if best > 0 else None,
+            }
+
+        if app is not None and scale == scales[0]:
+            yield record('startup', 'import_app', 0, cold_import_app)
+        # Build stages first: they populate the dataset the view cases read
+        for name, rows, func in build_cases(df_deliveries, df_matches, dataset):
+            yield record('build', name, rows, func)
+        for name, rows, func in view_cases(dataset):
+            yield record('compute', name, rows, func)
+        if app is not None:
+            for name, rows, func in view_cases(dataset, app):
+                rendered = record('render', name, rows, uncached(app.charts.chart_cache, func))
+                renders = app.charts.chart_cache.render_stats()
+                rendered['payload_bytes'] = int(renders.loc[renders['chart'].str.startswith(name + '.'), 'bytes'].sum())
+                yield rendered
+
+        del dataset, df_deliveries, df_matches
+        gc.collect()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dashboard views on synthetic data.")
+    parser.add_argument("--scales", default="1,10,100", help="comma-separated multiples of the IPL size")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--render", action="store_true", help="also run the Streamlit views (stubbed) including chart rendering")
+    parser.add_argument("--interactive-heatmaps", action="store_true",
+                        help="render heatmaps as Vega-Lite specs instead of PNGs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results.jsonl")
+    args = parser.parse_args(argv)
+
+    scales = [int(s) for s in args.scales.split(',') if s]
+    with open(args.out, 'a') as fh:
+        for record in run(scales, args.repeat, args.render, args.seed, args.interactive_heatmaps):
+            fh.write(json.dumps(record) + '\n')
+            fh.flush()
+            print(f"x{record['scale']:<4} {record['stage']:<8} {record['view']:<28} "
+                  f"{record['seconds'] * 1000:10.2f} ms {record['peak_bytes'] / 2**20:9.1f} MiB "
+                  f"{record['rows_per_second'] or 0:>14,} rows/s"
+                  + (f" {record['payload_bytes'] / 1024:10.1f} KiB" if 'payload_bytes' in record else ""))
+
+
+if __name__ == "__main__":
+    main()
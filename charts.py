@@ -0,0 +1,265 @@
+import importlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class LazyModule:
+    """Stands in for a module that is only imported on first attribute access.
+
+    matplotlib and seaborn take most of the app's import time but are only
+    needed once a view draws; `setup` runs once on the imported module.
+    """
+
+    def __init__(self, name, setup=None):
+        self._name = name
+        self._setup = setup
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                module = importlib.import_module(self._name)
+                if self._setup is not None:
+                    self._setup(module)
+                self._module = module
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, name):
+        return getattr(self._module or self._load(), name)
+
+
+plt = LazyModule('matplotlib.pyplot')
+sns = LazyModule('seaborn', setup=lambda sns: sns.set_style("whitegrid"))
+
+DEFAULT_BUDGET_MB = float(os.environ.get("IPL_CHART_CACHE_MB", "64"))
+
+# Heatmaps draw at most HEATMAP_ROWS rows (the rest are summed into one
+# "Others" row) and only annotate cells up to HEATMAP_ANNOTATE_CELLS
+HEATMAP_ROWS = int(os.environ.get("IPL_HEATMAP_ROWS", "25"))
+HEATMAP_ANNOTATE_CELLS = int(os.environ.get("IPL_HEATMAP_ANNOTATE_CELLS", "400"))
+
+# IPL_INTERACTIVE_HEATMAPS=1 sends heatmaps to the browser as Vega-Lite specs
+INTERACTIVE_HEATMAPS = os.environ.get("IPL_INTERACTIVE_HEATMAPS", "") not in ("", "0")
+
+# Vega schemes matching the matplotlib colormaps the views use
+VEGA_SCHEMES = {'YlGnBu': 'yellowgreenblue', 'viridis': 'viridis'}
+
+# Same savefig settings st.pyplot uses, so cached images look identical
+SAVEFIG_KWARGS = {'format': 'png', 'bbox_inches': 'tight', 'dpi': 200}
+
+
+def rasterize(fig):
+    """Render `fig` to PNG bytes and close it, even if rendering fails."""
+    try:
+        buf = io.BytesIO()
+        fig.savefig(buf, **SAVEFIG_KWARGS)
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def encode_spec(spec):
+    return json.dumps(spec, separators=(',', ':'), default=str).encode()
+
+
+def bound_rows(matrix, max_rows=HEATMAP_ROWS, others="Others"):
+    """The `max_rows` rows of `matrix` with the largest totals, plus one row
+    summing the rest. Returns (bounded matrix, number of rows folded)."""
+    if max_rows is None or len(matrix) <= max_rows:
+        return matrix, 0
+    order = matrix.sum(axis=1).sort_values(ascending=False, kind='stable').index
+    folded = len(order) - max_rows
+    top = matrix.loc[order[:max_rows]]
+    rest = matrix.loc[order[max_rows:]].sum().to_frame(f"{others} ({folded})").T
+    bounded = pd.concat([top.set_axis(top.index.astype(object)), rest])
+    bounded.index.name, bounded.columns.name = matrix.index.name, matrix.columns.name
+    return bounded, folded
+
+
+def heatmap(matrix, ax, cmap, annotate_cells=HEATMAP_ANNOTATE_CELLS, **kwargs):
+    """sns.heatmap with annotations switched off above `annotate_cells` cells."""
+    annotate = matrix.size <= annotate_cells
+    return sns.heatmap(matrix, cmap=cmap, annot=annotate, fmt='g', ax=ax, **kwargs)
+
+
+def heatmap_spec(matrix, title, xlabel, ylabel, cmap, annotate_cells=HEATMAP_ANNOTATE_CELLS):
+    """A Vega-Lite spec drawing `matrix` as a heatmap in the browser."""
+    rows = [str(label) for label in matrix.index]
+    columns = [str(label) for label in matrix.columns]
+    values = matrix.to_numpy()
+    # NaN cells are left out, so they stay blank
+    data = [
+        {'y': row, 'x': column, 'value': value.item()}
+        for row, line in zip(rows, values) for column, value in zip(columns, line) if not pd.isna(value)
+    ]
+    layers = [{
+        'mark': 'rect',
+        'encoding': {
+            'color': {'field': 'value', 'type': 'quantitative', 'title': None,
+                      'scale': {'scheme': VEGA_SCHEMES.get(cmap, cmap)}},
+            'tooltip': [{'field': 'y', 'title': ylabel}, {'field': 'x', 'title': xlabel},
+                        {'field': 'value', 'title': title}],
+        },
+    }]
+    if matrix.size <= annotate_cells:
+        layers.append({'mark': {'type': 'text', 'fontSize': 9}, 'encoding': {'text': {'field': 'value'}}})
+    return {
+        'title': title,
+        'data': {'values': data},
+        'encoding': {
+            'x': {'field': 'x', 'type': 'nominal', 'sort': columns, 'title': xlabel},
+            'y': {'field': 'y', 'type': 'nominal', 'sort': rows, 'title': ylabel},
+        },
+        'layer': layers,
+    }
+
+
+def depends_on(players=(), teams=(), venues=(), match_ids=(), seasons=None):
+    """What a cached chart depends on, declared by the view that draws it.
+
+    An append invalidates the chart if it touches a listed player, team,
+    venue or match, or a season in the inclusive (first, last) `seasons`
+    range. A chart declared with None depends on everything.
+    """
+    return {
+        'players': frozenset(players),
+        'teams': frozenset(teams),
+        'venues': frozenset(venues),
+        'match_ids': frozenset(int(match_id) for match_id in match_ids),
+        'seasons': seasons,
+    }
+
+
+def is_affected(depends, affected):
+    """Whether a chart declared with `depends` may change given the keys an append touched."""
+    if depends is None:
+        return True
+    if depends['seasons'] is not None:
+        first, last = depends['seasons']
+        if any(first <= season <= last for season in affected.get('seasons', ())):
+            return True
+    return any(depends[key] & set(affected.get(key, ())) for key in ('players', 'teams', 'venues', 'match_ids'))
+
+
+class ChartCache:
+    """Process-wide LRU cache of rendered chart images bounded by total bytes.
+
+    Keys are (view, params, data_version) tuples; each entry also keeps the
+    dependencies it was declared with (see depends_on). Shared by every
+    Streamlit session, so access is guarded by a lock.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.data_version = None
+        # Last render of each chart: format, time and payload size
+        self.renders = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, png, depends=None):
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[key] = (png, depends)
+            self._bytes += len(png)
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def get_or_render(self, key, draw, encode=rasterize, fmt='png', depends=None):
+        """Cached payload for `key`; on a miss `encode(draw())` renders it
+        (a PNG by default, or e.g. an encoded chart spec). `depends` says
+        which appends invalidate it; None means any."""
+        payload = self.get(key)
+        if payload is None:
+            start = time.perf_counter()
+            payload = encode(draw())
+            with self._lock:
+                self.renders[key[0]] = {
+                    'format': fmt,
+                    'ms': round((time.perf_counter() - start) * 1000, 1),
+                    'bytes': len(payload),
+                }
+            self.put(key, payload, depends)
+        return payload
+
+    def advance(self, data_version, affected_between):
+        """Switch to `data_version`, keeping entries that the change left valid.
+
+        `affected_between(old, new)` returns the keys (match ids, seasons and
+        entity names) touched since the old version, or None if unknown, in
+        which case entries under the old version are left to age out. Each
+        entry is checked against the dependencies it was declared with.
+        """
+        with self._lock:
+            old_version, self.data_version = self.data_version, data_version
+        if old_version is None or old_version == data_version:
+            return
+        affected = affected_between(old_version, data_version)
+        if affected is None:
+            return
+        with self._lock:
+            for key in [k for k in self._entries if k[2] == old_version]:
+                png, depends = self._entries.pop(key)
+                if is_affected(depends, affected):
+                    self._bytes -= len(png)
+                else:
+                    self._entries[(key[0], key[1], data_version)] = (png, depends)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def render_stats(self):
+        with self._lock:
+            return pd.DataFrame(
+                [{'chart': chart, **render} for chart, render in self.renders.items()],
+                columns=['chart', 'format', 'ms', 'bytes'],
+            )
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+chart_cache = ChartCache(int(DEFAULT_BUDGET_MB * 1024 * 1024))
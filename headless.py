@@ -0,0 +1,83 @@
+"""Run the dashboard views without a Streamlit session.
+
+Widgets return their defaults (or a preset answer per label) and output is
+dropped, so the views only compute and render into the shared caches.
+"""
+import contextlib
+import importlib.util
+import os
+import sys
+import types
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+
+def streamlit_stub(answers=None):
+    """A stand-in `streamlit` module: widgets return their default, output is dropped.
+
+    `answers` maps widget labels to the value to return instead.
+    """
+    stub = types.ModuleType('streamlit')
+    stub.answers = dict(answers or {})
+
+    def noop(*args, **kwargs):
+        return None
+
+    def cache(func=None, **kwargs):
+        return func if func is not None else (lambda f: f)
+
+    class Container:
+        def __getattr__(self, name):
+            return noop
+
+        def selectbox(self, label, options, *args, **kwargs):
+            if label in stub.answers:
+                return stub.answers[label]
+            options = list(options)
+            return options[0] if options else None
+
+        def radio(self, label, options, *args, **kwargs):
+            return stub.answers.get(label, list(options)[0])
+
+        def select_slider(self, label, options=(), value=None, **kwargs):
+            return stub.answers.get(label, value)
+
+        def slider(self, label, min_value=None, max_value=None, value=None, **kwargs):
+            return stub.answers.get(label, value)
+
+        def checkbox(self, label, value=False, **kwargs):
+            return stub.answers.get(label, value)
+
+        def columns(self, spec, **kwargs):
+            return [Container() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+        def expander(self, *args, **kwargs):
+            return contextlib.nullcontext(self)
+
+    container = Container()
+    stub.__getattr__ = lambda name: getattr(container, name)
+    stub.cache_data = cache
+    stub.cache_resource = cache
+    stub.session_state = {}
+    stub.sidebar = Container()
+    return stub
+
+
+def import_app(stub=None):
+    """Import app with `streamlit` itself replaced by the stub (benchmarks, scripts)."""
+    sys.modules['streamlit'] = stub or streamlit_stub()
+    import app
+    return app
+
+
+def load_app(stub, name='_headless_app'):
+    """A private copy of app.py whose views talk to `stub`.
+
+    Unlike import_app, the real streamlit module (and with it the shared
+    resource caches in `resources`) is left in place for live sessions.
+    """
+    spec = importlib.util.spec_from_file_location(name, APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.st = stub
+    return module
@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+# IPL_PROFILE=1 turns tracing on by default; IPL_PROFILE_LOG appends every
+# finished trace to that JSON-lines file
+ENABLED = os.environ.get("IPL_PROFILE", "") not in ("", "0")
+LOG_PATH = os.environ.get("IPL_PROFILE_LOG")
+
+_local = threading.local()
+
+
+def current_rss():
+    # Resident set size from /proc; None where that isn't available
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class _NullSpan:
+    active = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_rows(self, rows):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    active = True
+
+    def __init__(self, trace, name, rows):
+        self.trace = trace
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.depth = len(self.trace.stack)
+        self.parent = self.trace.stack[-1].name if self.trace.stack else None
+        self.trace.stack.append(self)
+        self.rss_before = current_rss()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        rss_after = current_rss()
+        self.trace.stack.pop()
+        self.trace.spans.append({
+            'name': self.name,
+            'parent': self.parent,
+            'depth': self.depth,
+            'offset_ms': round((self.start - self.trace.start) * 1000, 3),
+            'ms': round(seconds * 1000, 3),
+            'rows': self.rows,
+            'rss_delta_bytes': None if self.rss_before is None or rss_after is None else rss_after - self.rss_before,
+        })
+        return False
+
+    def set_rows(self, rows):
+        self.rows = rows
+
+
+class Trace:
+    """Spans recorded during one script run (one Streamlit rerun)."""
+
+    def __init__(self, label, **context):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.context = context
+        self.timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.start = time.perf_counter()
+        self.stack = []
+        self.spans = []
+
+    def frame(self):
+        df = pd.DataFrame(self.spans, columns=['name', 'parent', 'depth', 'offset_ms', 'ms', 'rows', 'rss_delta_bytes'])
+        return df.sort_values('offset_ms', kind='stable').reset_index(drop=True)
+
+    def records(self):
+        base = {'trace_id': self.id, 'label': self.label, 'timestamp': self.timestamp, **self.context}
+        return [{**base, **span} for span in sorted(self.spans, key=lambda s: s['offset_ms'])]
+
+    def to_jsonl(self):
+        return ''.join(json.dumps(record, default=str) + '\n' for record in self.records())
+
+
+def start_trace(label, **context):
+    _local.trace = Trace(label, **context)
+    return _local.trace
+
+
+def finish_trace():
+    trace = getattr(_local, 'trace', None)
+    _local.trace = None
+    if trace is not None and LOG_PATH:
+        with open(LOG_PATH, 'a') as fh:
+            fh.write(trace.to_jsonl())
+    return trace
+
+
+def span(name, rows=None):
+    """Time a block under the current trace; a shared no-op when not tracing."""
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        return NULL_SPAN
+    return Span(trace, name, rows)
+
+
+def result_rows(result):
+    # Total rows across the pandas objects a computation returned
+    if isinstance(result, dict):
+        return sum(result_rows(value) for value in result.values())
+    if isinstance(result, (pd.DataFrame, pd.Series, pd.Index, list)):
+        return len(result)
+    return 0
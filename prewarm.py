@@ -0,0 +1,155 @@
+"""Warm the shared caches at server boot, before the first visitor needs them.
+
+    python prewarm.py [streamlit run options]   # start the server with a prewarmer
+    python prewarm.py --once                    # warm once without a server and report timings
+
+A background thread loads the dataset and runs every view in app.VIEWS with
+its default selections against a headless copy of the app, which fills the
+resource caches in `resources` (tables, aggregates) and the chart cache.
+Under a plain `streamlit run app.py` the first session starts the thread.
+
+Time to first response (the first session's script run finishing) and time
+until fully warm are measured from process start, shown in the app's
+"Startup" panel and appended to IPL_PROFILE_LOG when that is set.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import instrumentation
+
+# IPL_PREWARM=0 turns the prewarmer off
+ENABLED = os.environ.get("IPL_PREWARM", "1") not in ("", "0")
+
+
+def process_start():
+    # Wall-clock start of this process from /proc; import time elsewhere
+    try:
+        with open('/proc/self/stat') as fh:
+            ticks = int(fh.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/stat') as fh:
+            boot = next(int(line.split()[1]) for line in fh if line.startswith('btime'))
+        return boot + ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, StopIteration, AttributeError):
+        return time.time()
+
+
+STARTED_AT = process_start()
+
+_lock = threading.Lock()
+_thread = None
+_status = {
+    'state': 'idle',
+    'first_response_seconds': None,
+    'warm_seconds': None,
+    'views': {},
+    'errors': {},
+}
+
+
+def _since_start():
+    return round(time.time() - STARTED_AT, 3)
+
+
+def _log(event, **fields):
+    if instrumentation.LOG_PATH:
+        record = {'event': event, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), **fields}
+        with open(instrumentation.LOG_PATH, 'a') as fh:
+            fh.write(json.dumps(record, default=str) + '\n')
+
+
+def run(views=None):
+    """Run each view once with its default selections; returns the report."""
+    global _thread
+    import headless
+
+    with _lock:
+        # Run inline (--once): the views' own start() calls become no-ops
+        if _thread is None:
+            _thread = threading.current_thread()
+        _status['state'] = 'warming'
+    stub = headless.streamlit_stub()
+    app = headless.load_app(stub)
+    for view in views or app.VIEWS:
+        stub.answers['Go to'] = view
+        start = time.perf_counter()
+        try:
+            app.main()
+        except Exception as e:
+            # A view that fails here just stays cold; sessions will show the error
+            with _lock:
+                _status['errors'][view] = repr(e)
+        with _lock:
+            _status['views'][view] = round(time.perf_counter() - start, 3)
+    with _lock:
+        _status['state'] = 'warm'
+        _status['warm_seconds'] = _since_start()
+    result = report()
+    _log('prewarm', **result)
+    print(f"prewarm: {len(result['views'])} views warm {result['warm_seconds']:.1f}s after start",
+          file=sys.stderr)
+    return result
+
+
+def start(views=None):
+    """Start the prewarm thread, once per process."""
+    global _thread
+    if not ENABLED:
+        return None
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=run, args=(views,), name='prewarm', daemon=True)
+            _thread.start()
+    return _thread
+
+
+def first_response():
+    # Called as each script run finishes; only the first real session counts
+    if threading.current_thread() is _thread:
+        return
+    with _lock:
+        if _status['first_response_seconds'] is not None:
+            return
+        _status['first_response_seconds'] = _since_start()
+    _log('first_response', seconds=_status['first_response_seconds'])
+
+
+def report():
+    with _lock:
+        return {
+            'state': _status['state'],
+            'first_response_seconds': _status['first_response_seconds'],
+            'warm_seconds': _status['warm_seconds'],
+            'views': dict(_status['views']),
+            'errors': dict(_status['errors']),
+        }
+
+
+def serve(streamlit_args):
+    # The server runs in this process, so the caches the thread fills are the
+    # ones its sessions read
+    from streamlit.web import cli
+    sys.argv = ['streamlit', 'run', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')]
+    sys.argv += streamlit_args
+    sys.exit(cli.main())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Start the dashboard with its caches warmed at boot.")
+    parser.add_argument("--once", action="store_true", help="warm once without a server and print the timings")
+    args, streamlit_args = parser.parse_known_args(argv)
+    if args.once:
+        print(json.dumps(run(), indent=2))
+        return
+    start()
+    serve(streamlit_args)
+
+
+if __name__ == "__main__":
+    # Go through the importable module so the app's `import prewarm` sees
+    # the same thread and timings
+    import prewarm
+    prewarm.main()
@@ -0,0 +1,46 @@
+"""Process-wide resources shared by every Streamlit session.
+
+Kept out of app.py so their caches are keyed by this module rather than by
+the script, and the boot-time prewarmer fills the same entries the sessions
+read.
+"""
+import streamlit as st
+
+import aggregates
+import analytics
+import backends
+import storage
+
+# Entries are keyed by data version: keep only the current one, so each
+# append replaces the previous dataset instead of adding to it. Script runs
+# already under way hold their own references to the old objects.
+MAX_VERSIONS = 1
+
+
+@st.cache_resource(max_entries=MAX_VERSIONS)
+def load_data(data_version=None):
+    # One read-only dataset per data version, shared by every session rather
+    # than copied per rerun. data_version only keys the cache; the typed
+    # columnar copy under data/.cache is rebuilt by storage.load_tables when
+    # a source CSV changes.
+    def build():
+        df_deliveries, df_matches = storage.load_tables()
+        return aggregates.enrich_deliveries(df_deliveries, df_matches), df_matches
+
+    try:
+        return storage.shared_tables(data_version, build)
+    except FileNotFoundError as e:
+        st.error(f"Error loading data: {e}")
+        return None, None
+
+
+@st.cache_resource(max_entries=MAX_VERSIONS)
+def get_dataset(_df_deliveries, _df_matches, data_version):
+    # Aggregates are built on first use and then shared by every session
+    return analytics.Dataset(_df_deliveries, _df_matches, data_version)
+
+
+@st.cache_resource(max_entries=MAX_VERSIONS)
+def get_sql_backend(name, data_version):
+    # Scans the columnar copies in place; the tables are never loaded
+    return backends.DuckDBBackend.from_storage()
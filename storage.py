@@ -0,0 +1,630 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+import uuid
+
+import pandas as pd
+
+import aggregates
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DATA_DIR = "data"
+DELIVERIES_CSV = os.path.join(DATA_DIR, "deliveries.csv")
+MATCHES_CSV = os.path.join(DATA_DIR, "matches.csv")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+APPEND_LOG = "appends.jsonl"
+
+# Older dumps use different names for the same columns
+DELIVERIES_RENAMES = {
+    'striker': 'batter',
+    'batsman': 'batter',
+    'batsman_runs': 'batter_runs',
+}
+
+# Typed schema for the columnar cache. Columns missing from a dump are skipped.
+DELIVERIES_DTYPES = {
+    'match_id': 'int64',
+    'inning': 'int8',
+    'over': 'int8',
+    'ball': 'int8',
+    'batter_runs': 'int16',
+    'extra_runs': 'int16',
+    'total_runs': 'int16',
+    'is_wicket': 'int8',
+    'batting_team': 'category',
+    'bowling_team': 'category',
+    'batter': 'category',
+    'bowler': 'category',
+    'non_striker': 'category',
+    'extras_type': 'category',
+    'player_dismissed': 'category',
+    'dismissal_kind': 'category',
+    'fielder': 'category',
+}
+
+# The only deliveries columns any dashboard view reads
+DELIVERIES_USED_COLUMNS = [
+    'match_id', 'inning', 'batting_team', 'bowling_team', 'over', 'ball',
+    'batter', 'bowler', 'batter_runs', 'extra_runs', 'total_runs',
+    'is_wicket', 'dismissal_kind',
+]
+
+DEFAULT_CHUNK_ROWS = 200_000
+
+# Columns sharing one dictionary per entity, across both tables, so that
+# e.g. a team has the same integer code in team1, winner and batting_team
+ENTITY_COLUMNS = {
+    'team': {
+        'matches': ['team1', 'team2', 'toss_winner', 'winner'],
+        'deliveries': ['batting_team', 'bowling_team'],
+    },
+    'player': {
+        'matches': ['player_of_match'],
+        'deliveries': ['batter', 'bowler', 'non_striker', 'player_dismissed', 'fielder'],
+    },
+    'venue': {'matches': ['venue'], 'deliveries': []},
+    'city': {'matches': ['city'], 'deliveries': []},
+    'umpire': {'matches': ['umpire1', 'umpire2'], 'deliveries': []},
+}
+
+MATCHES_DTYPES = {
+    'id': 'int64',
+    'season': 'int16',
+    'result_margin': 'float32',
+    'target_runs': 'float32',
+    'target_overs': 'float32',
+}
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def normalize_columns(df, renames=None):
+    df.columns = df.columns.str.strip().str.lower()
+    if renames:
+        df = df.rename(columns={k: v for k, v in renames.items() if k in df.columns})
+    return df
+
+
+def apply_schema(df, dtypes):
+    for column, dtype in dtypes.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        if dtype.startswith('int') and df[column].isna().any():
+            # Keep NaNs representable instead of failing the cast
+            dtype = dtype.capitalize()
+        df[column] = df[column].astype(dtype)
+    return df
+
+
+def read_deliveries_csv(path=DELIVERIES_CSV):
+    df = normalize_columns(pd.read_csv(path), DELIVERIES_RENAMES)
+    return apply_schema(df, DELIVERIES_DTYPES)
+
+
+def _union_dtype(parts):
+    # One categorical dtype for all parts. A part whose column is entirely
+    # empty comes back without categories (e.g. as float64 NaNs), so only the
+    # non-empty parts contribute
+    categories = pd.Index([])
+    for part in parts:
+        if isinstance(part.dtype, pd.CategoricalDtype):
+            categories = categories.append(part.cat.categories)
+        elif part.notna().any():
+            categories = categories.append(pd.Index(part.dropna().unique()))
+    return pd.CategoricalDtype(categories.unique())
+
+
+def _concat_chunks(chunks):
+    # Plain concat would fall back to object dtype when chunk categories differ
+    if not chunks:
+        return pd.DataFrame(columns=DELIVERIES_USED_COLUMNS)
+    columns = {}
+    for column in chunks[0].columns:
+        parts = [chunk[column] for chunk in chunks]
+        if any(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            dtype = _union_dtype(parts)
+            parts = [part.astype(dtype) for part in parts]
+        columns[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class ChunkedIngest:
+    """Result of streaming a deliveries CSV: the typed frame plus aggregates
+    accumulated chunk by chunk and memory figures for the run."""
+
+    def __init__(self, deliveries, batting, bowling, match_totals, chunks, seconds):
+        self.deliveries = deliveries
+        self.batting = batting
+        self.bowling = bowling
+        self.match_totals = match_totals
+        self.chunks = chunks
+        self.seconds = seconds
+        self.peak_rss = peak_rss_bytes()
+        self.frame_bytes = int(deliveries.memory_usage(deep=True).sum())
+
+    def report(self):
+        rows = len(self.deliveries)
+        return {
+            'rows': rows,
+            'chunks': self.chunks,
+            'seconds': round(self.seconds, 3),
+            'frame_bytes': self.frame_bytes,
+            'bytes_per_row': round(self.frame_bytes / rows, 1) if rows else 0.0,
+            'peak_rss_bytes': self.peak_rss,
+        }
+
+
+def ingest_deliveries_chunked(path=DELIVERIES_CSV, chunk_rows=DEFAULT_CHUNK_ROWS, columns=DELIVERIES_USED_COLUMNS,
+                              totals=True):
+    """Stream the deliveries CSV in chunks, keeping only `columns`.
+
+    Each chunk is normalized and downcast before the next one is read. With
+    `totals` the per-player and per-match totals are accumulated as chunks
+    arrive; otherwise those fields of the result are None.
+    """
+    wanted = set(columns)
+
+    def keep(raw_name):
+        name = raw_name.strip().lower()
+        return DELIVERIES_RENAMES.get(name, name) in wanted
+
+    start = time.perf_counter()
+    chunks, batting, bowling, matches = [], [], [], []
+    for chunk in pd.read_csv(path, usecols=keep, chunksize=chunk_rows):
+        chunk = apply_schema(normalize_columns(chunk, DELIVERIES_RENAMES), DELIVERIES_DTYPES)
+        if totals:
+            batting.append(aggregates.batting_totals(chunk))
+            bowling.append(aggregates.bowling_totals(chunk))
+            matches.append(aggregates.match_totals(chunk))
+        chunks.append(chunk)
+
+    deliveries = _concat_chunks(chunks)
+    if not totals:
+        return ChunkedIngest(deliveries, None, None, None, len(chunks), time.perf_counter() - start)
+    return ChunkedIngest(
+        deliveries,
+        aggregates.finish_batting(aggregates.combine_totals(batting)),
+        aggregates.finish_bowling(aggregates.combine_totals(bowling)),
+        aggregates.combine_totals(matches),
+        len(chunks),
+        time.perf_counter() - start,
+    )
+
+
+def read_deliveries_chunked(path=DELIVERIES_CSV):
+    # The app builds its player stats from the enriched frame (PlayerIndex),
+    # so loading skips accumulating them here
+    return ingest_deliveries_chunked(path, totals=False).deliveries
+
+
+def read_matches_csv(path=MATCHES_CSV):
+    df = normalize_columns(pd.read_csv(path))
+    return apply_schema(df, MATCHES_DTYPES)
+
+
+def _labels(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.categories
+    return pd.Index(series.dropna().unique())
+
+
+def encode_entities(df_deliveries, df_matches):
+    """Dictionary-encode entity columns with one shared dictionary per entity.
+
+    Every column listed in ENTITY_COLUMNS becomes a categorical whose
+    categories are the sorted union of names across all of that entity's
+    columns, so codes compare directly between columns and tables. Returns
+    the dictionaries as {entity: pd.Index}.
+    """
+    tables = {'matches': df_matches, 'deliveries': df_deliveries}
+    dictionaries = {}
+    for entity, by_table in ENTITY_COLUMNS.items():
+        present = [
+            (tables[table], column)
+            for table, columns in by_table.items()
+            for column in columns
+            if column in tables[table].columns
+        ]
+        if not present:
+            continue
+        names = pd.Index([])
+        for df, column in present:
+            names = names.union(_labels(df[column]))
+        categories = pd.Index(sorted(names.astype(str)))
+        dtype = pd.CategoricalDtype(categories)
+        for df, column in present:
+            df[column] = df[column].astype(dtype)
+        dictionaries[entity] = categories
+    return dictionaries
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(path):
+    stat = os.stat(path)
+    return {'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _cache_paths(name, cache_dir):
+    ext = 'parquet' if _parquet_available() else 'pkl'
+    return (
+        os.path.join(cache_dir, f"{name}.{ext}"),
+        os.path.join(cache_dir, f"{name}.manifest.json"),
+    )
+
+
+def _read_manifest(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _tmp_path(path):
+    # Unique per writer: processes and threads building the same file at
+    # once each write their own temp file, and the last os.replace wins
+    return f"{path}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp"
+
+
+def _write_manifest(path, manifest):
+    tmp = _tmp_path(path)
+    with open(tmp, 'w') as fh:
+        json.dump(manifest, fh)
+    os.replace(tmp, path)
+
+
+def _write_frame(df, path):
+    tmp = _tmp_path(path)
+    if path.endswith('.parquet'):
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def _read_frame(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def _read_cached(frame_path, manifest, cache_dir):
+    # The base copy plus any parts appended to it since it was built
+    df = _read_frame(frame_path)
+    parts = manifest.get('parts', [])
+    if not parts:
+        return df
+    return _concat_chunks([df] + [_read_frame(os.path.join(cache_dir, part)) for part in parts])
+
+
+def cached_frame(name, source_path, reader, cache_dir=CACHE_DIR):
+    """Read `source_path` through a typed columnar copy kept in `cache_dir`.
+
+    The copy is reused while the source CSV's mtime and size are unchanged.
+    If only the mtime moved (e.g. the file was touched or re-copied), the
+    content hash decides whether the copy is still valid. Copies extended by
+    `append_tables` carry no content hash and are rebuilt (and so compacted)
+    in that case.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    frame_path, manifest_path = _cache_paths(name, cache_dir)
+    fingerprint = source_fingerprint(source_path)
+    manifest = _read_manifest(manifest_path)
+
+    if manifest is not None and os.path.exists(frame_path):
+        if manifest.get('mtime') == fingerprint['mtime'] and manifest.get('size') == fingerprint['size']:
+            return _read_cached(frame_path, manifest, cache_dir), manifest['sha256']
+        sha256 = file_hash(source_path)
+        if manifest.get('sha256') == sha256:
+            _write_manifest(manifest_path, {**fingerprint, 'sha256': sha256})
+            return _read_frame(frame_path), sha256
+    else:
+        sha256 = file_hash(source_path)
+
+    df = reader(source_path)
+    _write_frame(df, frame_path)
+    _write_manifest(manifest_path, {**fingerprint, 'sha256': sha256})
+    return df, sha256
+
+
+def _write_arrow(df, path):
+    from pyarrow import feather
+    tmp = _tmp_path(path)
+    feather.write_feather(df, tmp, compression='uncompressed')
+    os.replace(tmp, path)
+
+
+def _map_arrow(path):
+    import pyarrow as pa
+    # split_blocks keeps numeric columns as zero-copy views of the mapping
+    return pa.ipc.open_file(pa.memory_map(path)).read_all().to_pandas(split_blocks=True)
+
+
+def _remove_stale_shared(version, cache_dir):
+    for name in os.listdir(cache_dir):
+        # Temp files belong to writers still building another version
+        if name.startswith('shared-') and not name.startswith(f'shared-{version}.') and not name.endswith('.tmp'):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:  # still mapped on platforms that lock open files
+                pass
+
+
+def shared_tables(version, build, cache_dir=CACHE_DIR):
+    """(deliveries, matches) as returned by `build()`, backed by read-only
+    memory-mapped Arrow files.
+
+    The tables are written once per data version, uncompressed, and mapped
+    back, so numeric columns are views over the OS page cache: every session
+    and every process loading the same version shares those pages instead of
+    holding a private copy. The mapped buffers cannot be written to. Without
+    pyarrow the built tables are returned as they are.
+    """
+    if version is None or not _parquet_available():
+        return build()
+    paths = [os.path.join(cache_dir, f"shared-{version}.{name}.arrow") for name in ('deliveries', 'matches')]
+    if not all(os.path.exists(path) for path in paths):
+        os.makedirs(cache_dir, exist_ok=True)
+        for df, path in zip(build(), paths):
+            _write_arrow(df, path)
+        _remove_stale_shared(version, cache_dir)
+    return tuple(_map_arrow(path) for path in paths)
+
+
+def data_version(deliveries_path=DELIVERIES_CSV, matches_path=MATCHES_CSV):
+    # Cheap key for st.cache_* functions: changes whenever either source file does
+    parts = []
+    for path in (deliveries_path, matches_path):
+        fingerprint = source_fingerprint(path)
+        parts.append(f"{path}:{fingerprint['mtime']}:{fingerprint['size']}")
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+
+def _deliveries_cache(chunked=None):
+    # IPL_CHUNKED_INGEST=1 selects the memory-bounded reader for large feeds
+    if chunked is None:
+        chunked = os.environ.get("IPL_CHUNKED_INGEST", "") not in ("", "0")
+    if chunked:
+        return 'deliveries-chunked', read_deliveries_chunked
+    return 'deliveries', read_deliveries_csv
+
+
+def load_tables(deliveries_path=DELIVERIES_CSV, matches_path=MATCHES_CSV, cache_dir=CACHE_DIR, chunked=None):
+    name, reader = _deliveries_cache(chunked)
+    df_deliveries, _ = cached_frame(name, deliveries_path, reader, cache_dir)
+    df_matches, _ = cached_frame('matches', matches_path, read_matches_csv, cache_dir)
+    encode_entities(df_deliveries, df_matches)
+    return df_deliveries, df_matches
+
+
+def columnar_files(name, source_path, reader, cache_dir=CACHE_DIR):
+    """Files making up the current columnar copy of `source_path`: the base
+    copy plus any appended parts. A stale copy is rebuilt first."""
+    manifest = _current_manifest(name, source_path, cache_dir)
+    if manifest is None:
+        cached_frame(name, source_path, reader, cache_dir)
+        manifest = _current_manifest(name, source_path, cache_dir)
+    frame_path, _ = _cache_paths(name, cache_dir)
+    return [frame_path] + [os.path.join(cache_dir, part) for part in manifest.get('parts', [])]
+
+
+def columnar_sources(deliveries_path=DELIVERIES_CSV, matches_path=MATCHES_CSV, cache_dir=CACHE_DIR, chunked=None):
+    # For engines that scan the parquet copies in place instead of loading them
+    if not _parquet_available():
+        raise RuntimeError("Querying the columnar copies in place needs pyarrow to write them as parquet")
+    name, reader = _deliveries_cache(chunked)
+    return {
+        'deliveries': columnar_files(name, deliveries_path, reader, cache_dir),
+        'matches': columnar_files('matches', matches_path, read_matches_csv, cache_dir),
+    }
+
+
+def _current_manifest(name, source_path, cache_dir):
+    # Manifest of a cached copy that is valid for the source as it is now
+    frame_path, manifest_path = _cache_paths(name, cache_dir)
+    manifest = _read_manifest(manifest_path)
+    if manifest is None or not os.path.exists(frame_path):
+        return None
+    fingerprint = source_fingerprint(source_path)
+    if manifest.get('mtime') != fingerprint['mtime'] or manifest.get('size') != fingerprint['size']:
+        return None
+    return manifest
+
+
+def _append_csv(df, path, renames=None):
+    """Append `df` to the CSV at `path` in its column order; returns the
+    byte offset at which the new rows start."""
+    header = pd.read_csv(path, nrows=0).columns
+    columns = normalize_columns(pd.DataFrame(columns=header), renames).columns
+    with open(path, 'rb+') as fh:
+        size = fh.seek(0, os.SEEK_END)
+        if size:
+            fh.seek(size - 1)
+            if fh.read(1) != b'\n':
+                fh.write(b'\n')
+        offset = fh.tell()
+    df.reindex(columns=columns).to_csv(path, mode='a', header=False, index=False)
+    return offset
+
+
+def _read_tail(path, offset, reader):
+    # Parse only the rows past `offset`, under the file's own header line
+    with open(path, 'rb') as fh:
+        header = fh.readline()
+        fh.seek(offset)
+        tail = fh.read()
+    return reader(io.BytesIO(header + tail))
+
+
+def _frame_dtypes(path):
+    # Column dtypes of a cached copy, from the parquet schema when there is one
+    if path.endswith('.parquet'):
+        from pyarrow import parquet
+        return parquet.read_schema(path).empty_table().to_pandas().dtypes
+    return _read_frame(path).dtypes
+
+
+def _cast_like(df, dtypes):
+    """`df` cast to `dtypes`, so that columns a part leaves entirely empty
+    (no wickets, no winner) are stored with the base copy's types."""
+    for column, dtype in dtypes.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            # Only the part's own categories; categorical columns hold labels,
+            # so an empty one is still typed as strings
+            dtype = pd.CategoricalDtype(pd.Index(df[column].dropna().unique(), dtype=str))
+        df[column] = df[column].astype(dtype)
+    return df
+
+
+def _append_part(name, df, manifest, source_path, cache_dir):
+    frame_path, manifest_path = _cache_paths(name, cache_dir)
+    parts = manifest.get('parts', [])
+    base, ext = os.path.splitext(frame_path)
+    part_path = f"{base}.part{len(parts) + 1:04d}{ext}"
+    _write_frame(_cast_like(df.copy(), _frame_dtypes(frame_path)), part_path)
+    _write_manifest(manifest_path, {
+        **source_fingerprint(source_path),
+        'sha256': None,
+        'parts': parts + [os.path.basename(part_path)],
+    })
+
+
+def append_tables(new_deliveries, new_matches, deliveries_path=DELIVERIES_CSV, matches_path=MATCHES_CSV,
+                  cache_dir=CACHE_DIR):
+    """Append new matches and their deliveries to the dataset.
+
+    Only the new rows are parsed and written: they are appended to both
+    source CSVs and stored as extra parts next to each cached copy that was
+    current, so no CSV is parsed again. The data version changes with the
+    CSVs; the returned report, also added to the append log, lists the match
+    ids, seasons, teams, venues and players the new rows touch so caches can
+    keep entries that do not depend on them.
+
+    That much costs time in proportion to the new matches. Loading the new
+    version still enriches and maps the full tables and rebuilds the
+    aggregates from them.
+    """
+    start = time.perf_counter()
+    new_matches = normalize_columns(new_matches.copy())
+    new_deliveries = normalize_columns(new_deliveries.copy(), DELIVERIES_RENAMES)
+    existing, _ = cached_frame('matches', matches_path, read_matches_csv, cache_dir)
+    new_ids = set(new_matches['id'])
+    if not new_ids:
+        raise ValueError("No matches to append")
+    if new_ids & set(existing['id']):
+        raise ValueError(f"Matches already ingested: {sorted(new_ids & set(existing['id']))}")
+    unknown = set(new_deliveries['match_id']) - new_ids
+    if unknown:
+        raise ValueError(f"Deliveries for matches not being appended: {sorted(unknown)}")
+
+    old_version = data_version(deliveries_path, matches_path)
+    readers = {
+        'matches': read_matches_csv,
+        'deliveries': read_deliveries_csv,
+        'deliveries-chunked': read_deliveries_chunked,
+    }
+    sources = {'matches': matches_path, 'deliveries': deliveries_path, 'deliveries-chunked': deliveries_path}
+    current = {name: _current_manifest(name, sources[name], cache_dir) for name in readers}
+
+    offsets = {
+        matches_path: _append_csv(new_matches, matches_path),
+        deliveries_path: _append_csv(new_deliveries, deliveries_path, DELIVERIES_RENAMES),
+    }
+    added = {}
+    for name, reader in readers.items():
+        if name == 'deliveries-chunked' and current[name] is None:
+            continue
+        added[name] = _read_tail(sources[name], offsets[sources[name]], reader)
+        if current[name] is not None:
+            _append_part(name, added[name], current[name], sources[name], cache_dir)
+
+    version = data_version(deliveries_path, matches_path)
+
+    report = {
+        'old_version': old_version,
+        'data_version': version,
+        'matches': len(added['matches']),
+        'deliveries': len(added['deliveries']),
+        'affected': aggregates.affected_keys(added['deliveries'], added['matches']),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    with open(os.path.join(cache_dir, APPEND_LOG), 'a') as fh:
+        fh.write(json.dumps(report) + '\n')
+    return report
+
+
+def appends_between(old_version, new_version, cache_dir=CACHE_DIR):
+    """Union of the keys affected by the appends leading from `old_version`
+    to `new_version`, or None if the change was not made by appends alone."""
+    try:
+        with open(os.path.join(cache_dir, APPEND_LOG)) as fh:
+            records = [json.loads(line) for line in fh if line.strip()]
+    except (OSError, ValueError):
+        return None
+    by_version = {record['old_version']: record for record in records}
+    affected = {}
+    version = old_version
+    for _ in range(len(by_version)):
+        if version == new_version:
+            break
+        record = by_version.get(version)
+        if record is None:
+            return None
+        for key, values in record['affected'].items():
+            affected.setdefault(key, set()).update(values)
+        version = record['data_version']
+    return affected if version == new_version else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest the deliveries CSV and report memory use.")
+    parser.add_argument("path", nargs="?", default=DELIVERIES_CSV)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--append-matches", metavar="CSV", help="append these matches instead of ingesting")
+    parser.add_argument("--append-deliveries", metavar="CSV", help="deliveries of the appended matches")
+    args = parser.parse_args(argv)
+
+    if args.append_matches:
+        if not args.append_deliveries:
+            parser.error("--append-matches needs --append-deliveries")
+        report = append_tables(pd.read_csv(args.append_deliveries), pd.read_csv(args.append_matches), args.path)
+        print(json.dumps(report, indent=2))
+        return
+
+    result = ingest_deliveries_chunked(args.path, chunk_rows=args.chunk_rows)
+    print(json.dumps(result.report(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+
+TEAMS = ('Chennai Super Kings', 'Mumbai Indians')
+
+
+def match_row(match_id, season, winner=TEAMS[0]):
+    return {
+        'id': match_id, 'season': season, 'city': 'Chennai', 'date': f'{season}-04-01',
+        'match_type': 'League', 'player_of_match': 'P1', 'venue': 'MA Chidambaram Stadium',
+        'team1': TEAMS[0], 'team2': TEAMS[1], 'toss_winner': TEAMS[0], 'toss_decision': 'bat',
+        'winner': winner, 'result': 'runs', 'result_margin': 10.0, 'target_runs': 150.0,
+        'target_overs': 20.0, 'super_over': 'N', 'method': None, 'umpire1': 'U1', 'umpire2': 'U2',
+    }
+
+
+def delivery_rows(match_id, balls=30, wickets=True):
+    rows = []
+    for i in range(balls):
+        inning = 1 + i * 2 // balls
+        batting, bowling = TEAMS if inning == 1 else TEAMS[::-1]
+        wicket = wickets and i % 10 == 9
+        rows.append({
+            'match_id': match_id, 'inning': inning, 'batting_team': batting, 'bowling_team': bowling,
+            'over': i // 6, 'ball': i % 6 + 1, 'batter': f'P{i % 4}', 'bowler': f'P{4 + i % 2}',
+            'non_striker': f'P{(i + 1) % 4}', 'batsman_runs': i % 3, 'extra_runs': 1 if wickets and i % 7 == 0 else 0,
+            'total_runs': i % 3 + (1 if wickets and i % 7 == 0 else 0),
+            'extras_type': 'wides' if wickets and i % 7 == 0 else None, 'is_wicket': int(wicket),
+            'player_dismissed': f'P{i % 4}' if wicket else None, 'dismissal_kind': 'caught' if wicket else None,
+            'fielder': 'P6' if wicket else None,
+        })
+    return rows
+
+
+def write_dataset(tmp_path):
+    deliveries_path, matches_path = tmp_path / 'deliveries.csv', tmp_path / 'matches.csv'
+    pd.DataFrame(delivery_rows(1) + delivery_rows(2)).to_csv(deliveries_path, index=False)
+    pd.DataFrame([match_row(1, 2008), match_row(2, 2008, TEAMS[1])]).to_csv(matches_path, index=False)
+    return str(deliveries_path), str(matches_path), str(tmp_path / 'cache')
+
+
+def test_append_match_without_wickets_then_load(tmp_path):
+    deliveries_path, matches_path, cache_dir = write_dataset(tmp_path)
+    storage.load_tables(deliveries_path, matches_path, cache_dir)
+    storage.load_tables(deliveries_path, matches_path, cache_dir, chunked=True)
+
+    # An abandoned match: no wickets or extras, so those columns are empty
+    new_deliveries = pd.DataFrame(delivery_rows(3, wickets=False))
+    storage.append_tables(new_deliveries, pd.DataFrame([match_row(3, 2009, None)]),
+                          deliveries_path, matches_path, cache_dir)
+
+    for chunked in (False, True):
+        deliveries, matches = storage.load_tables(deliveries_path, matches_path, cache_dir, chunked=chunked)
+        assert len(deliveries) == 90 and sorted(matches['id']) == [1, 2, 3]
+        assert isinstance(deliveries['dismissal_kind'].dtype, pd.CategoricalDtype)
+        assert deliveries['dismissal_kind'].notna().sum() == 6
+        assert set(deliveries['batter']) == {'P0', 'P1', 'P2', 'P3'}
+
+
+def test_chunked_ingest_with_empty_categorical_chunk(tmp_path):
+    path = tmp_path / 'deliveries.csv'
+    pd.DataFrame(delivery_rows(1) + delivery_rows(2, wickets=False)).to_csv(path, index=False)
+    chunked = storage.ingest_deliveries_chunked(str(path), chunk_rows=30).deliveries
+    assert len(chunked) == 60
+    assert chunked['dismissal_kind'].tolist()[:30] == storage.read_deliveries_csv(str(path))['dismissal_kind'].tolist()[:30]